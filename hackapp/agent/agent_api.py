@@ -4,6 +4,7 @@ Runs a simple Flask server to receive GUI automation commands from middleware
 """
 
 import time
+import socket
 import threading
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -11,6 +12,7 @@ from flask_cors import CORS
 try:
     import pyautogui
     import pyperclip
+    from ui_wait import wait_for_stable_screen, wait_for_clipboard
     PYAUTOGUI_AVAILABLE = True
 except (ImportError, OSError) as e:
     PYAUTOGUI_AVAILABLE = False
@@ -54,12 +56,16 @@ class AgentAPI:
                 content = data.get('content')
                 insert_method = data.get('insert_method', 'paste')
                 key_sequence = data.get('key_sequence', '')
+                # null/missing falls back to the default; negative sleeps would raise
+                key_interval = max(0.0, float(data.get('key_interval') or 0.05))
+                # False skips the clipboard backup/restore (and the wait before restoring)
+                preserve_clipboard = bool(data.get('preserve_clipboard', True))
 
                 print(f"   🔍 [AGENT API] VERSION 2.0 - Received write_coords: ({x}, {y}) = {content[:50]}...")
 
                 # Backup clipboard if using paste method
                 original_clipboard = None
-                if insert_method == "paste":
+                if insert_method == "paste" and preserve_clipboard:
                     try:
                         original_clipboard = pyperclip.paste()
                     except:
@@ -70,22 +76,22 @@ class AgentAPI:
                 print(f"   🔍 [AGENT API] Screen size: {pyautogui.size()}")
                 print(f"   🔍 [AGENT API] Current mouse position before click: {pyautogui.position()}")
                 pyautogui.click(x, y)
-                time.sleep(0.3)
+                wait_for_stable_screen(x, y, timeout=0.3)
                 print(f"   🔍 [AGENT API] Mouse position after click: {pyautogui.position()}")
 
                 # Insert content
                 if insert_method == "paste":
                     print(f"   📋 [AGENT API] Copying to clipboard: {content[:50]}...")
                     pyperclip.copy(content)
-                    clipboard_check = pyperclip.paste()
-                    print(f"   🔍 [AGENT API] Clipboard verify: {clipboard_check[:50]}...")
+                    clipboard_ready = wait_for_clipboard(content)
+                    print(f"   🔍 [AGENT API] Clipboard verify: {'ok' if clipboard_ready else 'not updated yet'}")
 
                     print(f"   ⌨️  [AGENT API] Pressing Ctrl+V")
                     pyautogui.hotkey('ctrl', 'v')
-                    time.sleep(0.2)
 
-                    # Restore clipboard
+                    # Restore clipboard (after giving the target app time to read it)
                     if original_clipboard is not None:
+                        time.sleep(0.2)
                         try:
                             pyperclip.copy(original_clipboard)
                             print(f"   🔍 [AGENT API] Clipboard restored")
@@ -95,16 +101,16 @@ class AgentAPI:
                     print(f"   ⌨️  [AGENT API] Typing content character by character")
                     pyautogui.write(content, interval=0.05)
 
-                time.sleep(0.2)
+                wait_for_stable_screen(x, y, timeout=0.2)
 
                 # Execute key sequence if provided
                 if key_sequence:
                     print(f"   🔍 [AGENT API] Executing key sequence: {key_sequence}")
-                    keys = [k.strip().lower() for k in key_sequence.split(',')]
-                    for key in keys:
-                        if key:
-                            pyautogui.press(key)
-                            time.sleep(0.1)
+                    keys = [k for k in (k.strip().lower() for k in key_sequence.split(',')) if k]
+                    if keys:
+                        # One call: pyautogui waits key_interval between keys
+                        # and applies its PAUSE once, not after every key
+                        pyautogui.press(keys, interval=key_interval)
 
                 print(f"   ✅ [AGENT API] Content written successfully")
 
@@ -135,9 +141,19 @@ class AgentAPI:
 
         self.server_thread = threading.Thread(target=run_server, daemon=True)
         self.server_thread.start()
-        time.sleep(1)  # Give server time to start
+        self._wait_until_listening(timeout=1.0)
         print(f"   ✅ Agent API ready on http://localhost:{self.port}")
 
+    def _wait_until_listening(self, timeout, interval=0.02):
+        """Poll until the server accepts connections (at most `timeout` seconds)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=interval):
+                    return
+            except OSError:
+                time.sleep(interval)
+
     def stop(self):
         """Stop the API server (Flask doesn't support graceful shutdown easily)"""
         # Flask in thread doesn't support easy shutdown
@@ -6,6 +6,7 @@ UI automation for inserting data into DXCare fields
 import pyautogui
 import time
 from typing import List
+from ui_wait import wait_for_stable_screen, wait_for_clipboard
 
 
 class FieldInserter:
@@ -54,7 +55,7 @@ class FieldInserter:
                 x, y = map(int, click_before.split(','))
                 print(f"      🖱️  Clicking field at ({x}, {y})...")
                 pyautogui.click(x, y)
-                time.sleep(0.3)
+                wait_for_stable_screen(x, y, timeout=0.3)
             except (ValueError, IndexError):
                 print(f"      ⚠️  Invalid click_before coordinates: {click_before}")
 
@@ -110,7 +111,7 @@ class FieldInserter:
 
         # Put new content on clipboard and paste
         pyperclip.copy(content)
-        time.sleep(0.05)
+        wait_for_clipboard(content, timeout=0.05)
         pyautogui.hotkey('ctrl', 'v')
         time.sleep(0.1)
 
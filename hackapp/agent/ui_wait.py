@@ -0,0 +1,105 @@
+"""
+UI Wait Helpers
+Poll observable screen/clipboard state instead of sleeping fixed delays
+"""
+
+import time
+import threading
+
+# mss reads the framebuffer directly; pyautogui grabs a full screenshot
+# and crops it, which is much slower per poll. Optional.
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+
+# Region watched around the click point while waiting for the UI to settle
+SETTLE_REGION_HALF = 40
+
+# Matching captures in a row (after a change) that count as settled
+STABLE_FRAMES = 3
+
+# mss instances are not thread-safe (Flask serves requests on threads)
+_local = threading.local()
+
+
+def _grab(region) -> bytes:
+    """Raw pixels of a (left, top, width, height) region"""
+    if MSS_AVAILABLE:
+        grabber = getattr(_local, "mss", None)
+        if grabber is None:
+            grabber = mss.mss()
+            _local.mss = grabber
+        left, top, width, height = region
+        return grabber.grab({"left": left, "top": top, "width": width, "height": height}).rgb
+
+    import pyautogui
+    return pyautogui.screenshot(region=region).tobytes()
+
+
+def wait_until_settled(grab, timeout, interval=0.01, stable_frames=STABLE_FRAMES) -> bool:
+    """
+    Poll `grab` until its result has changed and then stopped changing
+
+    An unchanged capture right after an action is not proof the UI is ready
+    (it may not have started redrawing yet), so this waits for a change
+    followed by `stable_frames` matching captures. If nothing changes it
+    waits the full `timeout`, i.e. the fixed delay this replaces: the
+    latency win only appears when the screen actually redraws.
+
+    Args:
+        grab: Callable returning a comparable capture
+        timeout: Maximum seconds to wait
+        interval: Seconds between captures
+        stable_frames: Matching captures needed after the change
+
+    Returns:
+        True if the capture settled before the timeout
+    """
+    deadline = time.monotonic() + timeout
+    previous = grab()
+    changed = False
+    unchanged = 0
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        current = grab()
+        if current != previous:
+            changed = True
+            unchanged = 0
+        elif changed:
+            unchanged += 1
+            if unchanged >= stable_frames:
+                return True
+        previous = current
+    return False
+
+
+def wait_for_stable_screen(x, y, timeout, interval=0.01):
+    """
+    Wait until the screen around (x, y) has redrawn and settled
+
+    See wait_until_settled; `timeout` is the fixed delay this replaces.
+    """
+    region = (max(0, x - SETTLE_REGION_HALF), max(0, y - SETTLE_REGION_HALF),
+              SETTLE_REGION_HALF * 2, SETTLE_REGION_HALF * 2)
+    wait_until_settled(lambda: _grab(region), timeout, interval)
+
+
+def wait_for_clipboard(content, timeout=0.2, interval=0.005):
+    """
+    Wait until the clipboard holds `content`
+
+    Returns:
+        True if the clipboard matched before the timeout
+    """
+    import pyperclip
+
+    deadline = time.monotonic() + timeout
+    while True:
+        if pyperclip.paste() == content:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
@@ -4,14 +4,22 @@ PHI-free logging for workflow executions
 """
 
 import json
+import queue
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List
 from collections import deque
+from itertools import islice
 from middleware.models import AuditLogEntry
 
 
+# Entries kept in memory for the dashboard's recent-activity view
+RECENT_ENTRIES_MAXLEN = 10000
+
+
 class AuditLogger:
     """
     Logs workflow executions WITHOUT any clinical data
@@ -39,8 +47,14 @@ class AuditLogger:
         self.logger = logging.getLogger('hackapp.audit')
         self.logger.setLevel(logging.INFO)
 
+        # Re-initialization replaces the previous handlers instead of stacking them
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+
         # In-memory buffer for recent entries (for dashboard)
-        self.recent_entries: deque = deque(maxlen=100)
+        self.recent_entries: deque = deque(maxlen=RECENT_ENTRIES_MAXLEN)
+
+        handlers = []
 
         # Console handler
         console_handler = logging.StreamHandler()
@@ -50,7 +64,7 @@ class AuditLogger:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         console_handler.setFormatter(console_format)
-        self.logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
         # File handler (if specified)
         if log_file:
@@ -64,7 +78,22 @@ class AuditLogger:
                 datefmt='%Y-%m-%dT%H:%M:%S'
             )
             file_handler.setFormatter(file_format)
-            self.logger.addHandler(file_handler)
+            handlers.append(file_handler)
+
+        # Callers only enqueue; a background thread does the console/file I/O
+        self._queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.logger.addHandler(QueueHandler(self._queue))
+        self._listener: Optional[QueueListener] = QueueListener(
+            self._queue, *handlers, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self.close)
+
+    def close(self):
+        """Flush queued entries and stop the background writer"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
 
     def log_workflow_execution(
         self,
@@ -170,9 +199,8 @@ class AuditLogger:
         Returns:
             List of recent log entries (newest first)
         """
-        entries = list(self.recent_entries)
-        entries.reverse()  # Newest first
-        return entries[:limit]
+        # Walk the buffer from the newest end; only `limit` entries are copied
+        return list(islice(reversed(self.recent_entries), max(limit, 0)))
 
 
 # ============================================================================
@@ -199,6 +227,8 @@ def init_audit_logger(log_file: Optional[str] = None):
         log_file: Path to audit log file
     """
     global _audit_logger
+    if _audit_logger is not None:
+        _audit_logger.close()
     _audit_logger = AuditLogger(log_file)
 
 
@@ -242,5 +272,7 @@ if __name__ == "__main__":
     print("\n4. Logging startup:")
     logger.log_startup(workflows_loaded=2, connectors_loaded=3)
 
+    logger.close()
+
     print("\n✅ Audit logger tests complete!")
     print("\nNOTE: No PHI/clinical data was logged ✅")
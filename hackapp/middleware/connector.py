@@ -3,8 +3,8 @@ Connector Abstraction
 Handles external service API calls
 """
 
-import time
-import requests
+import asyncio
+import httpx
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 from middleware.models import ConnectorConfig
@@ -23,7 +23,7 @@ class Connector(ABC):
         self.config = config
 
     @abstractmethod
-    def execute(self, endpoint: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, endpoint: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute an API call
 
@@ -39,6 +39,10 @@ class Connector(ABC):
         """
         pass
 
+    async def close(self):
+        """Release resources owned by the connector"""
+        pass
+
 
 class ConnectorError(Exception):
     """Exception raised for connector errors"""
@@ -52,13 +56,25 @@ class ConnectorError(Exception):
 class RestApiConnector(Connector):
     """REST API connector implementation"""
 
-    def __init__(self, config: ConnectorConfig):
+    def __init__(self, config: ConnectorConfig, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize REST connector
+
+        Args:
+            config: Connector configuration
+            http_client: Shared async HTTP client (connection pool). If omitted,
+                the connector creates its own client and closes it in close().
+        """
         super().__init__(config)
-        self.session = requests.Session()
+        # requests followed redirects by default; httpx does not
+        self._owns_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(follow_redirects=True)
+        self.headers: Dict[str, str] = {}
+        self.auth: Optional[tuple] = None
 
         # Set default headers
         if config.headers:
-            self.session.headers.update(config.headers)
+            self.headers.update(config.headers)
 
         # Setup authentication
         if config.auth:
@@ -70,16 +86,16 @@ class RestApiConnector(Connector):
 
         if auth.type == "bearer_token":
             token = auth.token or self._get_token_from_env(auth.token_env)
-            self.session.headers['Authorization'] = f'Bearer {token}'
+            self.headers['Authorization'] = f'Bearer {token}'
 
         elif auth.type == "api_key":
             token = auth.token or self._get_token_from_env(auth.token_env)
             header = auth.header or 'X-API-Key'
-            self.session.headers[header] = token
+            self.headers[header] = token
 
         elif auth.type == "basic":
             if auth.username and auth.password:
-                self.session.auth = (auth.username, auth.password)
+                self.auth = (auth.username, auth.password)
 
     def _get_token_from_env(self, env_var: Optional[str]) -> str:
         """Get token from environment variable"""
@@ -108,12 +124,12 @@ class RestApiConnector(Connector):
         endpoint_path = self.config.endpoints[endpoint_name]
         return f"{self.config.base_url.rstrip('/')}/{endpoint_path.lstrip('/')}"
 
-    def _make_request(
+    async def _make_request(
         self,
         url: str,
         method: str,
         data: Dict[str, Any]
-    ) -> requests.Response:
+    ) -> httpx.Response:
         """
         Make HTTP request with retries
 
@@ -138,11 +154,14 @@ class RestApiConnector(Connector):
         for attempt in range(max_retries + 1):
             try:
                 # Make request
-                response = self.session.request(
+                response = await self.http_client.request(
                     method=method,
                     url=url,
                     json=data,
-                    timeout=self.config.timeout
+                    headers=self.headers,
+                    auth=self.auth,
+                    timeout=self.config.timeout,
+                    follow_redirects=True
                 )
 
                 # Check for HTTP errors
@@ -150,21 +169,21 @@ class RestApiConnector(Connector):
 
                 return response
 
-            except requests.exceptions.Timeout as e:
+            except httpx.TimeoutException as e:
                 last_error = ConnectorError(
                     f"Request timeout after {self.config.timeout}s",
                     "TIMEOUT",
                     {"attempt": attempt + 1, "max_retries": max_retries}
                 )
 
-            except requests.exceptions.ConnectionError as e:
+            except httpx.TransportError as e:
                 last_error = ConnectorError(
                     f"Connection error: {str(e)}",
                     "CONNECTION_ERROR",
                     {"attempt": attempt + 1}
                 )
 
-            except requests.exceptions.HTTPError as e:
+            except httpx.HTTPStatusError as e:
                 # Don't retry on client errors (4xx)
                 if 400 <= e.response.status_code < 500:
                     raise ConnectorError(
@@ -194,12 +213,17 @@ class RestApiConnector(Connector):
                 else:
                     delay = initial_delay
 
-                time.sleep(delay)
+                await asyncio.sleep(delay)
 
         # All retries exhausted
         raise last_error
 
-    def execute(
+    async def close(self):
+        """Close the HTTP client if this connector created it (shared clients are closed by their owner)"""
+        if self._owns_client:
+            await self.http_client.aclose()
+
+    async def execute(
         self,
         endpoint: str,
         request_data: Dict[str, Any],
@@ -222,7 +246,7 @@ class RestApiConnector(Connector):
         url = self._get_endpoint_url(endpoint)
 
         try:
-            response = self._make_request(url, method, request_data)
+            response = await self._make_request(url, method, request_data)
 
             # Parse JSON response
             try:
@@ -282,17 +306,30 @@ class ConnectorRegistry:
         """List all registered connector names"""
         return list(self._connectors.keys())
 
+    def count(self) -> int:
+        """Number of registered connectors"""
+        return len(self._connectors)
+
+    async def close_all(self):
+        """Close every registered connector"""
+        for connector in self._connectors.values():
+            await connector.close()
+
 
 # ============================================================================
 # Connector factory
 # ============================================================================
 
-def create_connector(config: ConnectorConfig) -> Connector:
+def create_connector(
+    config: ConnectorConfig,
+    http_client: Optional[httpx.AsyncClient] = None
+) -> Connector:
     """
     Create a connector from configuration
 
     Args:
         config: Connector configuration
+        http_client: Optional shared async HTTP client for REST connectors
 
     Returns:
         Connector instance
@@ -301,7 +338,7 @@ def create_connector(config: ConnectorConfig) -> Connector:
         ValueError: If connector type is unknown
     """
     if config.type == "rest_api":
-        return RestApiConnector(config)
+        return RestApiConnector(config, http_client=http_client)
     elif config.type == "soap":
         raise NotImplementedError("SOAP connectors not yet implemented")
     elif config.type == "custom":
@@ -339,7 +376,7 @@ if __name__ == "__main__":
     # Test 1: Successful API call
     print("\n1. Test successful API call:")
     try:
-        response = connector.execute("post", {"test": "data"})
+        response = asyncio.run(connector.execute("post", {"test": "data"}))
         print(f"  ✅ Success! Response keys: {list(response.keys())[:5]}")
     except ConnectorError as e:
         print(f"  ❌ Error: {e}")
@@ -347,7 +384,7 @@ if __name__ == "__main__":
     # Test 2: Unknown endpoint
     print("\n2. Test unknown endpoint:")
     try:
-        response = connector.execute("unknown_endpoint", {})
+        response = asyncio.run(connector.execute("unknown_endpoint", {}))
         print(f"  ❌ Should have failed!")
     except ConnectorError as e:
         print(f"  ✅ Expected error: {e.error_code}")
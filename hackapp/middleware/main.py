@@ -4,18 +4,36 @@ REST API server for workflow orchestration
 """
 
 import os
+import re
+import sys
+import hmac
 import time
+import queue
+import signal
+import platform
+import subprocess
+import asyncio
+import logging
+import importlib
+import anyio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+import httpx
+import orjson
 from datetime import datetime
-from fastapi import FastAPI, HTTPException, Header, Request, File, Form, UploadFile
+from fastapi import FastAPI, HTTPException, Header, Request, File, Form, UploadFile, Depends
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import HTMLResponse, Response, ORJSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
-from typing import Optional
+from typing import Optional, Tuple
 from pathlib import Path
 
 from middleware.models import (
     TriggerRequest, WorkflowResponse, HealthResponse,
-    WorkflowListResponse, Context
+    WorkflowListResponse, Context,
+    PickerActivateRequest, PickerCoordsRequest, PickerPreviewRequest
 )
 from middleware.workflow_engine import WorkflowEngine
 from middleware.connector import ConnectorRegistry, create_connector
@@ -23,6 +41,25 @@ from middleware.config_loader import load_all_configs
 from middleware.audit import init_audit_logger, get_audit_logger
 from middleware.visual_workflows import VisualWorkflow, VisualWorkflowStorage
 from middleware.visual_executor import WorkflowExecutor
+from middleware.ocr import capture_region, image_to_text, encode_png_base64
+from middleware.picker_sessions import PickerSession, PickerSessionStore
+
+# Windows only: job objects tie the agent's lifetime to the middleware
+try:
+    import win32api
+    import win32con
+    import win32job
+    WIN32JOB_AVAILABLE = True
+except ImportError:
+    WIN32JOB_AVAILABLE = False
+
+# Fixed filesystem locations, resolved once at import
+_MODULE_DIR = Path(__file__).parent
+_STATIC_DIR = _MODULE_DIR / "static"
+_VOICE_HTML_PATH = _STATIC_DIR / "voice.html"
+_UPLOAD_DIR = _MODULE_DIR.parent / "data" / "excel_uploads"
+_HACKAPP_DIR = str(_MODULE_DIR.parent)
+_AGENT_PATH = _MODULE_DIR.parent / "agent" / "main.py"
 
 
 # ============================================================================
@@ -32,36 +69,115 @@ from middleware.visual_executor import WorkflowExecutor
 app = FastAPI(
     title="HackApp Middleware API",
     description="Configuration-driven middleware for DXCare integration",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # orjson encoding for all JSON endpoints
 )
 
-# CORS (allow agent to call from localhost)
+# CORS (allow dashboards to call from localhost)
+# Explicit lists keep Starlette on its set-lookup path; "*" with credentials is
+# also rejected by browsers.
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "CORS_ORIGINS",
+        "http://localhost:3000,http://localhost:5000,http://127.0.0.1:5000"
+    ).split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["authorization", "content-type"],
 )
 
-# Global state
-workflow_engine: Optional[WorkflowEngine] = None
-visual_workflow_storage: Optional[VisualWorkflowStorage] = None
-workflow_executor: Optional[WorkflowExecutor] = None
-startup_time: Optional[datetime] = None
+# Shared state (populated by startup_event, read by handlers via app.state)
+app.state.workflow_engine = None  # Optional[WorkflowEngine]
+app.state.visual_workflow_storage = None  # Optional[VisualWorkflowStorage]
+app.state.workflow_executor = None  # Optional[WorkflowExecutor]
+app.state.startup_time = None  # Optional[datetime]
+app.state.startup_monotonic = None  # Optional[float], time.monotonic() at startup (for uptime)
+app.state.workflows_json = None  # Optional[bytes], pre-serialized /api/workflows payload
+app.state.http_client = None  # Optional[httpx.AsyncClient], shared by all connectors
+
+# Thread pools for blocking work (None falls back to the loop's default executor)
+app.state.blocking_pool = None  # Optional[ThreadPoolExecutor], OCR / Excel reads
+app.state.gui_pool = None  # Optional[ThreadPoolExecutor], single worker: screen automation must not overlap
+
+# Dashboard HTML, read once at startup (None if the file is missing)
+app.state.dashboard_html = None  # Optional[bytes]
+app.state.excel_html = None  # Optional[bytes]
 
 # Picker coordination state
-picker_sessions: dict = {}  # session_id -> {"field_name": str, "coordinates": Optional[tuple]}
-current_session_id: Optional[str] = None
+app.state.picker_sessions = PickerSessionStore(maxsize=1024, ttl=300)  # session_id -> PickerSession
+app.state.current_session_id = None  # Optional[str]
+app.state.picker_lock = asyncio.Lock()  # Guards picker_sessions / current_session_id updates
 
 # Agent process state
-agent_process = None  # Subprocess running the agent
-agent_start_time: Optional[datetime] = None
+app.state.agent_process = None  # Subprocess running the agent
+app.state.agent_start_monotonic = None  # Optional[float], time.monotonic() at spawn
+app.state.agent_job = None  # Windows job handle that kills the agent if we exit
+app.state.agent_logs = deque(maxlen=2000)  # Last lines of agent stdout/stderr
+app.state.agent_log_task = None  # Task draining the agent's output pipe
+app.state.agent_lock = asyncio.Lock()  # Serializes agent start/stop
 
 # Configuration
+# LOG_LEVEL=WARNING silences per-request INFO lines (formatted lazily, so
+# suppressed records cost almost nothing)
+logger = logging.getLogger("hackapp.middleware")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Runtime logging goes through a queue so request handlers never block on
+# console writes; the listener thread does the actual I/O.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(logging.Formatter(
+    '%(asctime)s [MIDDLEWARE] %(levelname)s %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+))
+_console_handler.addFilter(logging.Filter("hackapp.middleware"))
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
+
+# Agent output is echoed verbatim through the same queue
+agent_output = logging.getLogger("hackapp.agent")
+agent_output.setLevel(logging.INFO)
+_agent_console_handler = logging.StreamHandler()
+_agent_console_handler.setFormatter(logging.Formatter('%(message)s'))
+_agent_console_handler.addFilter(logging.Filter("hackapp.agent"))
+agent_output.addHandler(QueueHandler(_log_queue))
+agent_output.propagate = False
+
+log_listener = QueueListener(_log_queue, _console_handler, _agent_console_handler)
+
 MIDDLEWARE_TOKEN = os.getenv("MIDDLEWARE_TOKEN", "hackathon_demo_token")
+_MIDDLEWARE_TOKEN_BYTES = MIDDLEWARE_TOKEN.encode("utf-8")
+
+# Bearer auth scheme (auto_error=False so failures stay 401 with our messages)
+security = HTTPBearer(auto_error=False)
 AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH", "logs/audit.log")
 
+# Chunk size for streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Optional modules that handlers import lazily, imported in the background at
+# startup (pandas, pyautogui and pytesseract already load with visual_executor)
+PRELOAD_MODULES = ("openpyxl",)
+
+# How long to watch a freshly spawned agent for an immediate crash
+AGENT_STARTUP_PROBE_SECONDS = 0.5
+
+# Trailing output lines reported as last_error for a dead agent
+AGENT_LAST_ERROR_LINES = 10
+
+# Upper bound for how long /api/picker/status holds a long-poll request
+PICKER_LONG_POLL_MAX = 25.0
+
+# Digit runs in OCR text (same extraction as the visual executor)
+_DIGITS_RE = re.compile(r'\d+')
+
 
 # ============================================================================
 # Startup / Shutdown
@@ -70,45 +186,78 @@ AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH", "logs/audit.log")
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup"""
-    global workflow_engine, visual_workflow_storage, workflow_executor, startup_time
+    log_listener.start()
+
+    _write_lines(
+        "=" * 70,
+        "🧠 HackApp Middleware Starting...",
+        "=" * 70,
+        "",
+        "📂 Loading configurations...",
+    )
 
-    print("=" * 70)
-    print("🧠 HackApp Middleware Starting...")
-    print("=" * 70)
+    # Upload target for the Excel dashboard
+    _UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Agent exits are delivered to the loop via pidfd where supported
+    _install_pidfd_child_watcher()
 
     try:
         # Initialize audit logger
         init_audit_logger(AUDIT_LOG_PATH)
         audit_logger = get_audit_logger()
 
+        # Keep blocking C-extension work (OCR, Excel, GUI automation) off the event loop
+        app.state.blocking_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hackapp-blocking")
+        app.state.gui_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hackapp-gui")
+
+        # Import openpyxl (pandas loads it lazily) in the background so the
+        # first Excel read doesn't pay for it (fire-and-forget, startup doesn't wait)
+        asyncio.get_running_loop().run_in_executor(app.state.blocking_pool, _preload_heavy_modules)
+
         # Load configurations
-        print("\n📂 Loading configurations...")
         workflows, connector_configs, icd10_catalog = load_all_configs()
 
         # Create connector registry
-        print("\n🔌 Initializing connectors...")
+        _write_lines("", "🔌 Initializing connectors...")
         connector_registry = ConnectorRegistry()
 
+        # One pooled client for all connectors so keep-alive connections are reused
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+            timeout=30.0,
+            follow_redirects=True
+        )
+        app.state.http_client = http_client
+
         for name, config in connector_configs.items():
-            connector = create_connector(config)
+            connector = create_connector(config, http_client=http_client)
             connector_registry.register(name, connector)
 
         # Initialize workflow engine
-        print("\n⚙️  Initializing workflow engine...")
+        _write_lines("", "⚙️  Initializing workflow engine...")
         workflow_engine = WorkflowEngine(
             workflows=workflows,
             connector_registry=connector_registry,
             icd10_catalog=icd10_catalog
         )
+        app.state.workflow_engine = workflow_engine
+
+        # Workflows only change on restart, so serialize the list payload once
+        _rebuild_workflow_cache()
 
-        # Initialize visual workflow system
-        print("\n🎨 Initializing visual workflow system...")
+        # Initialize visual workflow system (prints nothing itself, so its
+        # status goes out with the ready banner below)
         visual_workflow_storage = VisualWorkflowStorage()
-        workflow_executor = WorkflowExecutor()
+        app.state.visual_workflow_storage = visual_workflow_storage
+        app.state.workflow_executor = WorkflowExecutor()
         visual_workflows = visual_workflow_storage.list()
-        print(f"✅ Loaded {len(visual_workflows)} visual workflows")
 
-        startup_time = datetime.now()
+        # Cache dashboard pages so GET / and /excel never touch the disk
+        _load_dashboards()
+
+        app.state.startup_time = datetime.now()
+        app.state.startup_monotonic = time.monotonic()
 
         # Log startup
         audit_logger.log_startup(
@@ -116,121 +265,361 @@ async def startup_event():
             connectors_loaded=len(connector_configs)
         )
 
-        print("\n" + "=" * 70)
-        print("✅ HackApp Middleware Ready!")
-        print(f"   📋 Workflows: {len(workflows)}")
-        print(f"   🔌 Connectors: {len(connector_configs)}")
-        print(f"   🏥 ICD-10 Codes: {len(icd10_catalog)}")
-        print(f"   🚀 API: http://localhost:5000")
-        print("=" * 70 + "\n")
+        _write_lines(
+            "",
+            "🎨 Initializing visual workflow system...",
+            f"✅ Loaded {len(visual_workflows)} visual workflows",
+            "",
+            "=" * 70,
+            "✅ HackApp Middleware Ready!",
+            f"   📋 Workflows: {len(workflows)}",
+            f"   🔌 Connectors: {len(connector_configs)}",
+            f"   🏥 ICD-10 Codes: {len(icd10_catalog)}",
+            "   🚀 API: http://localhost:5000",
+            "=" * 70,
+            "",
+            "🤖 Starting agent automatically...",
+        )
 
         # Auto-start agent
-        print("🤖 Starting agent automatically...")
         try:
             await _auto_start_agent()
         except Exception as e:
-            print(f"⚠️  Failed to auto-start agent: {e}")
-            print("   You can start it manually if needed")
+            _write_lines(
+                f"⚠️  Failed to auto-start agent: {e}",
+                "   You can start it manually if needed",
+            )
 
-    except Exception as e:
-        print(f"\n❌ Startup failed: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Startup failed")
         raise
 
 
-async def _auto_start_agent():
-    """Helper function to auto-start agent on middleware startup"""
-    global agent_process, agent_start_time
-    import subprocess
-    import sys
-    import platform
+def _write_lines(*lines: str):
+    """Write console lines with a single write + flush (output stays contiguous)"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
-    # Get the path to the agent main.py
-    agent_path = Path(__file__).parent.parent / "agent" / "main.py"
 
-    if not agent_path.exists():
-        print(f"   ⚠️  Agent script not found: {agent_path}")
-        return
+def _preload_heavy_modules():
+    """
+    Import slow-to-load optional modules (blocking; run in a worker thread)
+
+    Handlers import these lazily; once they are in sys.modules those
+    imports are free.
+    """
+    for module_name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            # Optional dependency missing, or GUI libs without a display
+            logger.info("Skipped preloading %s: %s", module_name, e)
+
+
+def _rebuild_workflow_cache():
+    """
+    Serialize the /api/workflows payload from the current engine
+
+    Call again after anything that changes workflow_engine.workflows.
+    """
+    workflow_engine = app.state.workflow_engine
+    app.state.workflows_json = orjson.dumps({
+        "workflows": [
+            {
+                "workflow_id": workflow.workflow_id,
+                "name": workflow.name,
+                "hotkey": hotkey,
+                "connector": workflow.connector,
+                "enabled": workflow.enabled
+            }
+            for hotkey, workflow in workflow_engine.workflows.items()
+        ],
+        "total": len(workflow_engine.workflows)
+    })
+
+
+def _read_static(filename: str) -> Optional[bytes]:
+    """Read a static dashboard file as bytes, or None if it does not exist"""
+    path = _STATIC_DIR / filename
+    return path.read_bytes() if path.exists() else None
+
+
+def _load_dashboards():
+    """(Re)load cached dashboard HTML into app.state"""
+    app.state.dashboard_html = _read_static("index.html")
+    app.state.excel_html = _read_static("excel.html")
 
-    # Set up environment with PYTHONPATH
+
+def _build_agent_env(hackapp_dir: str) -> dict:
+    """Environment for the agent subprocess (PYTHONPATH + UTF-8 console)"""
     agent_env = os.environ.copy()
-    hackapp_dir = str(agent_path.parent.parent)
 
-    # Add hackapp directory to PYTHONPATH
+    # Add hackapp directory to PYTHONPATH so imports work
     if 'PYTHONPATH' in agent_env:
         agent_env['PYTHONPATH'] = f"{hackapp_dir}{os.pathsep}{agent_env['PYTHONPATH']}"
     else:
         agent_env['PYTHONPATH'] = hackapp_dir
 
-    # Force UTF-8 encoding for Windows console
+    # Force UTF-8 encoding for Windows console to handle emoji characters
     agent_env['PYTHONIOENCODING'] = 'utf-8'
 
-    # Windows-specific setup
-    startupinfo = None
-    creationflags = 0
-    if platform.system() == 'Windows':
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        creationflags = 0x08000000  # CREATE_NO_WINDOW
-
-    # Start agent process - don't capture stdout/stderr to avoid pipe blocking
-    # Agent output will print directly to middleware console
-    agent_process = subprocess.Popen(
-        [sys.executable, "-u", str(agent_path)],
-        cwd=hackapp_dir,
-        env=agent_env,
-        stdout=None,  # Inherit from parent (middleware console)
-        stderr=None,  # Inherit from parent (middleware console)
-        startupinfo=startupinfo,
-        creationflags=creationflags
+    return agent_env
+
+
+# Agent launch settings never change while the middleware runs
+_AGENT_ENV = _build_agent_env(_HACKAPP_DIR)
+_IS_WINDOWS = platform.system() == 'Windows'
+if _IS_WINDOWS:
+    # Hide the console window
+    _AGENT_STARTUPINFO = subprocess.STARTUPINFO()
+    _AGENT_STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _AGENT_CREATIONFLAGS = 0x08000000  # CREATE_NO_WINDOW
+else:
+    _AGENT_STARTUPINFO = None
+    _AGENT_CREATIONFLAGS = 0
+
+
+def _install_pidfd_child_watcher():
+    """
+    Have asyncio learn about agent exits through a pidfd
+
+    Before Python 3.12 the default child watcher parks a thread in waitpid()
+    per child. On Linux >= 5.3 a pidfd lets the kernel wake the event loop
+    directly when the agent exits, which is what process.wait() then
+    awaits. Newer Pythons pick this watcher themselves; elsewhere (Windows,
+    old kernels, non-default loops) the default is left alone.
+    """
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    if type(asyncio.get_event_loop_policy()) is not asyncio.DefaultEventLoopPolicy:
+        return  # e.g. uvloop, which tracks children itself
+
+    try:
+        os.close(os.pidfd_open(os.getpid()))  # ENOSYS on kernels < 5.3
+        watcher = asyncio.PidfdChildWatcher()
+        watcher.attach_loop(asyncio.get_running_loop())
+        asyncio.set_child_watcher(watcher)
+    except (OSError, NotImplementedError):
+        pass
+
+
+def _bind_agent_to_job(agent_process: asyncio.subprocess.Process):
+    """
+    Kill the agent with the middleware on Windows
+
+    POSIX needs nothing here: the loop's child watcher reaps the agent as
+    soon as it exits. On Windows the agent is put in a job object with
+    KILL_ON_JOB_CLOSE, so the OS stops it when the last job handle closes,
+    including when the middleware crashes.
+
+    Returns:
+        Job handle to keep for the agent's lifetime, or None
+    """
+    if not WIN32JOB_AVAILABLE:
+        return None
+
+    try:
+        job = win32job.CreateJobObject(None, "")
+        info = win32job.QueryInformationJobObject(job, win32job.JobObjectExtendedLimitInformation)
+        info["BasicLimitInformation"]["LimitFlags"] |= win32job.JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+        win32job.SetInformationJobObject(job, win32job.JobObjectExtendedLimitInformation, info)
+
+        handle = win32api.OpenProcess(
+            win32con.PROCESS_SET_QUOTA | win32con.PROCESS_TERMINATE, False, agent_process.pid
+        )
+        try:
+            win32job.AssignProcessToJobObject(job, handle)
+        finally:
+            win32api.CloseHandle(handle)
+        return job
+    except Exception as e:
+        logger.warning("Could not assign agent to a job object: %s", e)
+        return None
+
+
+async def _spawn_agent() -> asyncio.subprocess.Process:
+    """
+    Launch the agent as an asyncio subprocess
+
+    The event loop's child watcher reports the exit, so callers can await
+    process.wait() instead of sleeping and polling.
+
+    Returns:
+        Running process handle
+    """
+    # stdout/stderr are piped and drained continuously (see
+    # _drain_agent_output), so the pipe never fills and blocks the agent
+    agent_process = await asyncio.create_subprocess_exec(
+        sys.executable, "-u", str(_AGENT_PATH),  # -u for unbuffered output
+        cwd=_HACKAPP_DIR,  # Run from hackapp/ directory
+        env=_AGENT_ENV,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,  # One interleaved stream, as on a console
+        startupinfo=_AGENT_STARTUPINFO,
+        creationflags=_AGENT_CREATIONFLAGS,
+        # Own process group on POSIX so stop signals reach anything it spawns
+        start_new_session=not _IS_WINDOWS
     )
 
-    agent_start_time = datetime.now()
+    # Replacing the previous job handle is harmless: its agent is gone
+    app.state.agent_job = _bind_agent_to_job(agent_process)
+
+    app.state.agent_logs.clear()
+    app.state.agent_log_task = asyncio.create_task(_drain_agent_output(agent_process))
+    return agent_process
+
+
+async def _drain_agent_output(agent_process: asyncio.subprocess.Process):
+    """
+    Copy agent output into the log ring buffer until the pipe closes
+
+    Lines are also echoed to the middleware console, where the agent used
+    to print directly. The deque keeps memory bounded however long it runs.
+    """
+    agent_logs = app.state.agent_logs
+    while True:
+        try:
+            raw = await agent_process.stdout.readline()
+        except ValueError:
+            continue  # Over-long line: the reader already dropped it
+        if not raw:
+            break
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        agent_logs.append(line)
+        agent_output.info(line)
+
+
+async def _agent_crashed_on_start(agent_process: asyncio.subprocess.Process) -> bool:
+    """
+    Wait briefly for an immediate crash
+
+    Returns as soon as the process exits; a healthy agent costs at most
+    AGENT_STARTUP_PROBE_SECONDS.
+    """
+    try:
+        await asyncio.wait_for(agent_process.wait(), timeout=AGENT_STARTUP_PROBE_SECONDS)
+        return True
+    except asyncio.TimeoutError:
+        return False
 
-    # Give it a moment to start
-    import asyncio
-    await asyncio.sleep(1.0)  # Longer delay to let agent initialize
 
-    if agent_process.poll() is not None:
-        print(f"   ❌ Agent crashed immediately (exit code: {agent_process.returncode})")
-        agent_process = None
-        agent_start_time = None
+def _signal_agent_group(agent_process: asyncio.subprocess.Process, force: bool = False):
+    """
+    Stop the agent together with any children it started
+
+    On POSIX the agent leads its own session, so its pid is the process
+    group id and SIGTERM/SIGKILL go to the whole group. Windows has no
+    equivalent here; terminate()/kill() are used and the agent's job object
+    takes care of the rest of the tree.
+    """
+    if hasattr(os, "killpg"):
+        os.killpg(agent_process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    elif force:
+        agent_process.kill()
     else:
-        print(f"   ✅ Agent started successfully with PID: {agent_process.pid}")
-        print(f"   📝 Agent output will appear below:")
+        agent_process.terminate()
+
+
+async def _terminate_agent(agent_process: asyncio.subprocess.Process, timeout: float = 5.0) -> bool:
+    """
+    Terminate the agent, escalating to kill if it does not exit in time
+
+    Awaits the child's exit through the event loop rather than polling.
+
+    Args:
+        agent_process: Running agent process
+        timeout: Seconds to wait for a graceful exit
+
+    Returns:
+        True if the agent exited gracefully, False if it had to be killed
+    """
+    try:
+        _signal_agent_group(agent_process)
+    except ProcessLookupError:
+        # Already exited between the liveness check and terminate()
+        await agent_process.wait()
+        return True
+
+    try:
+        await asyncio.wait_for(agent_process.wait(), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        try:
+            _signal_agent_group(agent_process, force=True)
+        except ProcessLookupError:
+            pass
+        await agent_process.wait()
+        return False
+
+
+async def _auto_start_agent():
+    """Helper function to auto-start agent on middleware startup"""
+    if not _AGENT_PATH.exists():
+        _write_lines(f"   ⚠️  Agent script not found: {_AGENT_PATH}")
+        return
+
+    agent_process = await _spawn_agent()
+    app.state.agent_process = agent_process
+    app.state.agent_start_monotonic = time.monotonic()
+
+    if await _agent_crashed_on_start(agent_process):
+        _write_lines(f"   ❌ Agent crashed immediately (exit code: {agent_process.returncode})")
+        app.state.agent_process = None
+        app.state.agent_start_monotonic = None
+    else:
+        _write_lines(
+            f"   ✅ Agent started successfully with PID: {agent_process.pid}",
+            "   📝 Agent output will appear below:",
+        )
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    global agent_process
-
-    print("\n🛑 Shutting down HackApp Middleware...")
+    _write_lines("", "🛑 Shutting down HackApp Middleware...")
 
     # Stop agent process if running
-    if agent_process is not None and agent_process.poll() is None:
-        print("🛑 Stopping agent process...")
-        try:
-            agent_process.terminate()
-            agent_process.wait(timeout=5)
-            print("✅ Agent process stopped")
-        except:
-            agent_process.kill()
-            agent_process.wait()
-            print("⚠️  Agent process force killed")
+    agent_process = app.state.agent_process
+    if agent_process is not None and agent_process.returncode is None:
+        _write_lines("🛑 Stopping agent process...")
+        if await _terminate_agent(agent_process):
+            _write_lines("✅ Agent process stopped")
+        else:
+            _write_lines("⚠️  Agent process force killed")
+
+    # Output pipe closes with the agent; don't wait on stray holders
+    if app.state.agent_log_task is not None:
+        app.state.agent_log_task.cancel()
+        app.state.agent_log_task = None
+
+    # Stop worker threads
+    for pool_name in ("blocking_pool", "gui_pool"):
+        pool = getattr(app.state, pool_name)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+            setattr(app.state, pool_name, None)
+
+    # Close pooled connector connections
+    if app.state.workflow_engine is not None:
+        await app.state.workflow_engine.connector_registry.close_all()
+    if app.state.http_client is not None:
+        await app.state.http_client.aclose()
+        app.state.http_client = None
 
     audit_logger = get_audit_logger()
     audit_logger.log_shutdown()
+    audit_logger.close()
+
+    log_listener.stop()
 
 
 # ============================================================================
 # Authentication
 # ============================================================================
 
-def verify_token(authorization: Optional[str] = Header(None)):
+def _check_authorization(authorization: Optional[str]):
     """
-    Verify bearer token
+    Verify a raw Authorization header value
 
     Args:
         authorization: Authorization header
@@ -241,28 +630,60 @@ def verify_token(authorization: Optional[str] = Header(None)):
     if not authorization:
         raise HTTPException(status_code=401, detail="Missing authorization header")
 
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Invalid authentication scheme")
+    scheme, sep, token = authorization.partition(" ")
+    token = token.strip()
+    if not sep or not token:
+        raise HTTPException(status_code=401, detail="Invalid authorization header format")
+
+    if scheme.lower() != "bearer":
+        raise HTTPException(status_code=401, detail="Invalid authentication scheme")
 
-        if token != MIDDLEWARE_TOKEN:
-            raise HTTPException(status_code=401, detail="Invalid token")
+    # Constant-time comparison (bytes, so non-ASCII input can't raise)
+    if not hmac.compare_digest(token.encode("utf-8"), _MIDDLEWARE_TOKEN_BYTES):
+        raise HTTPException(status_code=401, detail="Invalid token")
 
-    except ValueError:
+
+def verify_token(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """
+    FastAPI dependency enforcing the bearer token
+
+    Attach with dependencies=[Depends(verify_token)].
+
+    Raises:
+        HTTPException: 401 if the header is missing or the token is invalid
+    """
+    if credentials is None:
+        # HTTPBearer(auto_error=False) gives None for a missing or malformed
+        # header; re-check the raw value for a precise 401 message
+        _check_authorization(request.headers.get("Authorization"))
         raise HTTPException(status_code=401, detail="Invalid authorization header format")
 
+    token = credentials.credentials.strip()
+    if not hmac.compare_digest(token.encode("utf-8"), _MIDDLEWARE_TOKEN_BYTES):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
 
 # ============================================================================
 # API Endpoints
 # ============================================================================
 
 @app.get("/", response_class=HTMLResponse, tags=["Root"])
-async def root():
-    """Root endpoint - serves dashboard"""
-    dashboard_path = Path(__file__).parent / "static" / "index.html"
-    if dashboard_path.exists():
-        return HTMLResponse(content=dashboard_path.read_text(encoding='utf-8'), status_code=200)
+async def root(reload: bool = False, authorization: str = Header(None)):
+    """
+    Root endpoint - serves dashboard
+
+    Pass ?reload=1 with a valid token to re-read the dashboards from disk.
+    """
+    if reload:
+        _check_authorization(authorization)
+        _load_dashboards()
+
+    dashboard_html = app.state.dashboard_html
+    if dashboard_html is not None:
+        return HTMLResponse(content=dashboard_html, status_code=200)
     else:
         # Fallback if dashboard doesn't exist yet
         return {
@@ -281,11 +702,19 @@ async def root():
 
 
 @app.get("/excel", response_class=HTMLResponse, tags=["Dashboard"])
-async def excel_dashboard():
-    """Excel automation dashboard"""
-    excel_path = Path(__file__).parent / "static" / "excel.html"
-    if excel_path.exists():
-        return HTMLResponse(content=excel_path.read_text(encoding='utf-8'), status_code=200)
+async def excel_dashboard(reload: bool = False, authorization: str = Header(None)):
+    """
+    Excel automation dashboard
+
+    Pass ?reload=1 with a valid token to re-read the dashboards from disk.
+    """
+    if reload:
+        _check_authorization(authorization)
+        _load_dashboards()
+
+    excel_html = app.state.excel_html
+    if excel_html is not None:
+        return HTMLResponse(content=excel_html, status_code=200)
     else:
         raise HTTPException(status_code=404, detail="Excel dashboard not found")
 
@@ -293,9 +722,9 @@ async def excel_dashboard():
 @app.get("/voice", response_class=HTMLResponse, tags=["Dashboard"])
 async def voice_dashboard():
     """Voice recording dashboard"""
-    voice_path = Path(__file__).parent / "static" / "voice.html"
-    if voice_path.exists():
-        return HTMLResponse(content=voice_path.read_text(encoding='utf-8'), status_code=200)
+    if _VOICE_HTML_PATH.exists():
+        # Streamed from disk (sendfile where available), no decode/re-encode
+        return FileResponse(_VOICE_HTML_PATH, media_type="text/html")
     else:
         raise HTTPException(status_code=404, detail="Voice dashboard not found")
 
@@ -307,6 +736,7 @@ async def health_check():
 
     Returns service status and statistics
     """
+    workflow_engine = app.state.workflow_engine
     if workflow_engine is None:
         return HealthResponse(
             status="unhealthy",
@@ -314,53 +744,38 @@ async def health_check():
             connectors_active=0
         )
 
-    uptime = (datetime.now() - startup_time).total_seconds() if startup_time else 0
+    startup_monotonic = app.state.startup_monotonic
+    uptime = time.monotonic() - startup_monotonic if startup_monotonic else 0.0
 
     return HealthResponse(
         status="healthy",
         workflows_loaded=len(workflow_engine.workflows),
-        connectors_active=len(workflow_engine.connector_registry.list()),
+        connectors_active=workflow_engine.connector_registry.count(),
         uptime_seconds=uptime
     )
 
 
-@app.get("/api/workflows", response_model=WorkflowListResponse, tags=["Workflows"])
-async def list_workflows(authorization: str = Header(None)):
+@app.get("/api/workflows", response_model=WorkflowListResponse, tags=["Workflows"], dependencies=[Depends(verify_token)])
+async def list_workflows():
     """
     List all available workflows
 
-    Requires authentication.
+    Requires authentication. The payload is pre-serialized at startup.
     """
-    verify_token(authorization)
-
-    if workflow_engine is None:
+    workflows_json = app.state.workflows_json
+    if workflows_json is None:
         raise HTTPException(status_code=503, detail="Workflow engine not initialized")
 
-    workflows_list = []
-    for hotkey, workflow in workflow_engine.workflows.items():
-        workflows_list.append({
-            "workflow_id": workflow.workflow_id,
-            "name": workflow.name,
-            "hotkey": hotkey,
-            "connector": workflow.connector,
-            "enabled": workflow.enabled
-        })
-
-    return WorkflowListResponse(
-        workflows=workflows_list,
-        total=len(workflows_list)
-    )
+    return Response(content=workflows_json, media_type="application/json")
 
 
-@app.get("/api/audit/recent", tags=["Monitoring"])
-async def get_recent_audit_logs(limit: int = 50, authorization: str = Header(None)):
+@app.get("/api/audit/recent", tags=["Monitoring"], dependencies=[Depends(verify_token)])
+async def get_recent_audit_logs(limit: int = 50):
     """
     Get recent audit log entries
 
     Requires authentication.
     """
-    verify_token(authorization)
-
     audit_logger = get_audit_logger()
     entries = audit_logger.get_recent_entries(limit=limit)
 
@@ -370,10 +785,9 @@ async def get_recent_audit_logs(limit: int = 50, authorization: str = Header(Non
     }
 
 
-@app.post("/api/trigger", response_model=WorkflowResponse, tags=["Workflows"])
+@app.post("/api/trigger", response_model=WorkflowResponse, tags=["Workflows"], dependencies=[Depends(verify_token)])
 async def trigger_workflow(
-    request: TriggerRequest,
-    authorization: str = Header(None)
+    request: TriggerRequest
 ):
     """
     Trigger a workflow
@@ -382,34 +796,33 @@ async def trigger_workflow(
 
     Args:
         request: Trigger request with hotkey and context
-        authorization: Bearer token
 
     Returns:
         WorkflowResponse with insertion instructions or error
     """
-    verify_token(authorization)
-
+    workflow_engine = app.state.workflow_engine
     if workflow_engine is None:
         raise HTTPException(status_code=503, detail="Workflow engine not initialized")
 
     try:
         # Execute workflow
-        response = workflow_engine.execute(
+        response = await workflow_engine.execute(
             hotkey=request.hotkey,
             context=request.context
         )
 
-        return response
+        # The engine already built a validated model; serialize it in
+        # pydantic-core directly instead of re-validating and re-encoding it
+        # through the response_model path
+        return Response(content=response.model_dump_json(), media_type="application/json")
 
     except ValueError as e:
         # Validation or workflow errors
         raise HTTPException(status_code=400, detail=str(e))
 
-    except Exception as e:
+    except Exception:
         # Unexpected errors
-        print(f"❌ Unexpected error in trigger_workflow: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error in trigger_workflow")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -417,95 +830,84 @@ async def trigger_workflow(
 # Visual Workflow Endpoints
 # ============================================================================
 
-@app.get("/api/visual-workflows", tags=["Visual Workflows"])
-async def list_visual_workflows(authorization: str = Header(None)):
+@app.get("/api/visual-workflows", tags=["Visual Workflows"], dependencies=[Depends(verify_token)])
+async def list_visual_workflows():
     """List all visual workflows"""
-    verify_token(authorization)
-
-    if visual_workflow_storage is None:
+    storage = app.state.visual_workflow_storage
+    if storage is None:
         raise HTTPException(status_code=503, detail="Visual workflow system not initialized")
 
-    workflows = visual_workflow_storage.list()
-    return {
-        "workflows": [wf.model_dump(mode='json') for wf in workflows],
-        "total": len(workflows)
-    }
+    return Response(content=storage.list_json(), media_type="application/json")
 
 
-@app.post("/api/visual-workflows", tags=["Visual Workflows"])
-async def create_visual_workflow(workflow: VisualWorkflow, authorization: str = Header(None)):
+@app.post("/api/visual-workflows", tags=["Visual Workflows"], dependencies=[Depends(verify_token)])
+async def create_visual_workflow(workflow: VisualWorkflow):
     """Create a new visual workflow"""
-    verify_token(authorization)
-
-    if visual_workflow_storage is None:
+    storage = app.state.visual_workflow_storage
+    if storage is None:
         raise HTTPException(status_code=503, detail="Visual workflow system not initialized")
 
     try:
-        created = visual_workflow_storage.create(workflow)
-        return {"status": "created", "workflow": created.model_dump(mode='json')}
+        created = storage.create(workflow)
+        return {"status": "created", "workflow": storage.dump(created)}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/api/visual-workflows/{workflow_id}", tags=["Visual Workflows"])
-async def get_visual_workflow(workflow_id: str, authorization: str = Header(None)):
+@app.get("/api/visual-workflows/{workflow_id}", tags=["Visual Workflows"], dependencies=[Depends(verify_token)])
+async def get_visual_workflow(workflow_id: str):
     """Get a specific visual workflow"""
-    verify_token(authorization)
-
-    if visual_workflow_storage is None:
+    storage = app.state.visual_workflow_storage
+    if storage is None:
         raise HTTPException(status_code=503, detail="Visual workflow system not initialized")
 
-    workflow = visual_workflow_storage.get(workflow_id)
+    workflow = storage.get(workflow_id)
     if not workflow:
         raise HTTPException(status_code=404, detail=f"Workflow '{workflow_id}' not found")
 
-    return workflow.model_dump(mode='json')
+    return Response(content=orjson.dumps(storage.dump(workflow)), media_type="application/json")
 
 
-@app.put("/api/visual-workflows/{workflow_id}", tags=["Visual Workflows"])
+@app.put("/api/visual-workflows/{workflow_id}", tags=["Visual Workflows"], dependencies=[Depends(verify_token)])
 async def update_visual_workflow(
     workflow_id: str,
-    workflow: VisualWorkflow,
-    authorization: str = Header(None)
+    workflow: VisualWorkflow
 ):
     """Update a visual workflow"""
-    verify_token(authorization)
-
-    if visual_workflow_storage is None:
+    storage = app.state.visual_workflow_storage
+    if storage is None:
         raise HTTPException(status_code=503, detail="Visual workflow system not initialized")
 
     try:
-        updated = visual_workflow_storage.update(workflow_id, workflow)
-        return {"status": "updated", "workflow": updated.model_dump(mode='json')}
+        updated = storage.update(workflow_id, workflow)
+        return {"status": "updated", "workflow": storage.dump(updated)}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@app.delete("/api/visual-workflows/{workflow_id}", tags=["Visual Workflows"])
-async def delete_visual_workflow(workflow_id: str, authorization: str = Header(None)):
+@app.delete("/api/visual-workflows/{workflow_id}", tags=["Visual Workflows"], dependencies=[Depends(verify_token)])
+async def delete_visual_workflow(workflow_id: str):
     """Delete a visual workflow"""
-    verify_token(authorization)
-
-    if visual_workflow_storage is None:
+    storage = app.state.visual_workflow_storage
+    if storage is None:
         raise HTTPException(status_code=503, detail="Visual workflow system not initialized")
 
-    visual_workflow_storage.delete(workflow_id)
+    storage.delete(workflow_id)
     return {"status": "deleted", "workflow_id": workflow_id}
 
 
-@app.post("/api/visual-workflows/{workflow_id}/execute", tags=["Visual Workflows"])
+@app.post("/api/visual-workflows/{workflow_id}/execute", tags=["Visual Workflows"], dependencies=[Depends(verify_token)])
 async def execute_visual_workflow(
     workflow_id: str,
-    request: Request,
-    authorization: str = Header(None)
+    request: Request
 ):
     """Execute a visual workflow with optional initial variables"""
-    verify_token(authorization)
-
-    if visual_workflow_storage is None or workflow_executor is None:
+    storage = app.state.visual_workflow_storage
+    executor = app.state.workflow_executor
+    if storage is None or executor is None:
         raise HTTPException(status_code=503, detail="Visual workflow system not initialized")
 
-    workflow = visual_workflow_storage.get(workflow_id)
+    workflow = storage.get(workflow_id)
     if not workflow:
         raise HTTPException(status_code=404, detail=f"Workflow '{workflow_id}' not found")
 
@@ -517,9 +919,15 @@ async def execute_visual_workflow(
         except:
             initial_variables = {}
 
-        result = workflow_executor.execute(
-            workflow.model_dump(mode='json'),
-            initial_variables=initial_variables
+        # Cached dump: the same dict until the workflow changes, which lets
+        # the executor reuse its compiled step plan.
+        # It drives the mouse/keyboard and sleeps, so run it off the loop.
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            app.state.gui_pool,
+            executor.execute,
+            storage.dump(workflow),
+            initial_variables
         )
         return result
     except Exception as e:
@@ -530,10 +938,9 @@ async def execute_visual_workflow(
 # Picker Coordination Endpoints
 # ============================================================================
 
-@app.post("/api/picker/activate", tags=["Picker"])
+@app.post("/api/picker/activate", tags=["Picker"], dependencies=[Depends(verify_token)])
 async def activate_picker(
-    request: dict,
-    authorization: str = Header(None)
+    request: PickerActivateRequest
 ):
     """
     Activate coordinate picker for a specific field
@@ -544,22 +951,26 @@ async def activate_picker(
             "field_name": "patient_coords" | "output_coords"
         }
     """
-    verify_token(authorization)
-
-    global current_session_id, picker_sessions
-
-    session_id = request.get("session_id")
-    field_name = request.get("field_name")
-
-    if not session_id or not field_name:
-        raise HTTPException(status_code=400, detail="Missing session_id or field_name")
+    session_id = request.session_id
+    field_name = request.field_name
 
     # Create/update picking session
-    picker_sessions[session_id] = {
-        "field_name": field_name,
-        "coordinates": None
-    }
-    current_session_id = session_id
+    async with app.state.picker_lock:
+        # Long-polls on a replaced session would otherwise sleep on an event
+        # that is never set. Re-activating the same id: wake them so they
+        # re-poll the fresh session. A different previously active session
+        # can no longer receive coordinates: drop it (its pollers get 404)
+        replaced = app.state.picker_sessions.get(session_id)
+        if replaced is not None:
+            replaced.event.set()
+        previous_id = app.state.current_session_id
+        if previous_id and previous_id != session_id:
+            previous = app.state.picker_sessions.pop(previous_id)
+            if previous is not None:
+                previous.event.set()
+
+        app.state.picker_sessions[session_id] = PickerSession(field_name=field_name)
+        app.state.current_session_id = session_id
 
     return {
         "status": "picker_activated",
@@ -569,10 +980,9 @@ async def activate_picker(
     }
 
 
-@app.post("/api/picker/coordinates", tags=["Picker"])
+@app.post("/api/picker/coordinates", tags=["Picker"], dependencies=[Depends(verify_token)])
 async def receive_coordinates(
-    request: dict,
-    authorization: str = Header(None)
+    request: PickerCoordsRequest
 ):
     """
     Receive coordinates from agent
@@ -584,23 +994,22 @@ async def receive_coordinates(
             "y": 456
         }
     """
-    verify_token(authorization)
-
-    global current_session_id, picker_sessions
-
-    x = request.get("x")
-    y = request.get("y")
-
-    if x is None or y is None:
-        raise HTTPException(status_code=400, detail="Missing x or y coordinates")
+    x = request.x
+    y = request.y
 
     # If there's an active session, update it
-    if current_session_id and current_session_id in picker_sessions:
-        picker_sessions[current_session_id]["coordinates"] = (x, y)
+    async with app.state.picker_lock:
+        session_id = app.state.current_session_id
+        session = app.state.picker_sessions.get(session_id) if session_id else None
+        if session is not None:
+            session.coordinates = (x, y)
+            session.event.set()
+
+    if session is not None:
         return {
             "status": "coordinates_received",
-            "session_id": current_session_id,
-            "field_name": picker_sessions[current_session_id]["field_name"],
+            "session_id": session_id,
+            "field_name": session.field_name,
             "x": x,
             "y": y
         }
@@ -613,14 +1022,18 @@ async def receive_coordinates(
     }
 
 
-@app.get("/api/picker/status/{session_id}", tags=["Picker"])
+@app.get("/api/picker/status/{session_id}", tags=["Picker"], dependencies=[Depends(verify_token)])
 async def get_picker_status(
     session_id: str,
-    authorization: str = Header(None)
+    wait: float = 0
 ):
     """
     Poll for picker status (for dashboard)
 
+    With ?wait=N the request is held (up to PICKER_LONG_POLL_MAX seconds)
+    until coordinates arrive, so dashboards can long-poll instead of
+    hammering this endpoint on a timer. Without it, returns immediately.
+
     Returns:
         {
             "status": "waiting" | "completed",
@@ -628,32 +1041,47 @@ async def get_picker_status(
             "coordinates": {"x": 123, "y": 456} | null
         }
     """
-    verify_token(authorization)
-
-    if session_id not in picker_sessions:
+    session = app.state.picker_sessions.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found")
 
-    session = picker_sessions[session_id]
-    coordinates = session["coordinates"]
+    if session.coordinates is None and wait > 0:
+        try:
+            await asyncio.wait_for(
+                session.event.wait(),
+                timeout=min(wait, PICKER_LONG_POLL_MAX)
+            )
+        except asyncio.TimeoutError:
+            pass
+
+        # Woken because the session was re-activated: report the new one
+        session = app.state.picker_sessions.get(session_id) or session
+
+    coordinates = session.coordinates
 
     if coordinates:
         return {
             "status": "completed",
-            "field_name": session["field_name"],
+            "field_name": session.field_name,
             "coordinates": {"x": coordinates[0], "y": coordinates[1]}
         }
     else:
         return {
             "status": "waiting",
-            "field_name": session["field_name"],
+            "field_name": session.field_name,
             "coordinates": None
         }
 
 
-@app.post("/api/picker/preview-ocr", tags=["Picker"])
+def _capture_and_ocr(x: int, y: int, width: int, height: int) -> Tuple[str, str]:
+    """Capture a region and OCR it (blocking; run in a worker thread)"""
+    screenshot = capture_region(x, y, width, height)
+    return encode_png_base64(screenshot), image_to_text(screenshot)
+
+
+@app.post("/api/picker/preview-ocr", tags=["Picker"], dependencies=[Depends(verify_token)])
 async def preview_ocr(
-    request: dict,
-    authorization: str = Header(None)
+    request: PickerPreviewRequest
 ):
     """
     Test OCR capture at coordinates and return screenshot preview
@@ -673,39 +1101,18 @@ async def preview_ocr(
             "ocr_text": "..."
         }
     """
-    verify_token(authorization)
-
-    try:
-        import pyautogui
-        import pytesseract
-        import base64
-        from io import BytesIO
-        import re
-    except ImportError as e:
-        raise HTTPException(status_code=500, detail=f"Missing dependency: {str(e)}")
-
     try:
-        x = request.get("x")
-        y = request.get("y")
-        width = request.get("width", 150)
-        height = request.get("height", 40)
-
-        if x is None or y is None:
-            raise HTTPException(status_code=400, detail="Missing x or y coordinates")
-
-        # Take screenshot
-        screenshot = pyautogui.screenshot(region=(x, y, width, height))
-
-        # Convert to base64
-        buffered = BytesIO()
-        screenshot.save(buffered, format="PNG")
-        img_base64 = base64.b64encode(buffered.getvalue()).decode()
+        x, y = request.x, request.y
+        width, height = request.width, request.height
 
-        # OCR to extract text
-        ocr_text = pytesseract.image_to_string(screenshot).strip()
+        # Screenshot, PNG encode and OCR all block - run them in the pool
+        loop = asyncio.get_running_loop()
+        img_base64, ocr_text = await loop.run_in_executor(
+            app.state.blocking_pool, _capture_and_ocr, x, y, width, height
+        )
 
         # Extract numbers (same logic as executor)
-        numbers = re.findall(r'\d+', ocr_text)
+        numbers = _DIGITS_RE.findall(ocr_text)
         extracted_id = numbers[0] if numbers else None
 
         return {
@@ -716,6 +1123,8 @@ async def preview_ocr(
             "coordinates": {"x": x, "y": y, "width": width, "height": height}
         }
 
+    except ImportError as e:
+        raise HTTPException(status_code=500, detail=f"Missing dependency: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OCR preview failed: {str(e)}")
 
@@ -724,11 +1133,10 @@ async def preview_ocr(
 # Excel Helper Endpoints
 # ============================================================================
 
-@app.post("/api/excel/upload", tags=["Excel"])
+@app.post("/api/excel/upload", tags=["Excel"], dependencies=[Depends(verify_token)])
 async def upload_excel(
-    file: bytes = File(...),
-    filename: str = Form(...),
-    authorization: str = Header(None)
+    file: UploadFile = File(...),
+    filename: str = Form(...)
 ):
     """
     Upload Excel file and return its full path
@@ -739,22 +1147,14 @@ async def upload_excel(
             "file_path": "C:\\full\\path\\to\\file.xlsx"
         }
     """
-    verify_token(authorization)
-
     try:
-        from pathlib import Path
-        import os
+        # Save file with original name (directory is created at startup)
+        file_path = _UPLOAD_DIR / filename
 
-        # Create uploads directory if not exists
-        upload_dir = Path(__file__).parent.parent / "data" / "excel_uploads"
-        upload_dir.mkdir(parents=True, exist_ok=True)
-
-        # Save file with original name
-        file_path = upload_dir / filename
-
-        # Write file
-        with open(file_path, "wb") as f:
-            f.write(file)
+        # Stream to disk in 1 MB chunks so memory stays bounded
+        async with await anyio.open_file(file_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await f.write(chunk)
 
         return {
             "status": "success",
@@ -765,10 +1165,24 @@ async def upload_excel(
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
-@app.post("/api/excel/columns", tags=["Excel"])
+def _read_excel_header(file_path: str, sheet_name) -> list:
+    """
+    Column names of a sheet (blocking; run in a worker thread)
+
+    Read through pandas with nrows=0 and the lookup step's engine, so blank
+    and duplicate headers get exactly the names ("Unnamed: 3", "Name.1")
+    the lookup_excel step will see. Both engines stop after the header row.
+    """
+    import pandas as pd
+    from middleware.visual_executor import EXCEL_ENGINE
+
+    with pd.ExcelFile(file_path, engine=EXCEL_ENGINE) as xls:
+        return list(pd.read_excel(xls, sheet_name=sheet_name, nrows=0).columns)
+
+
+@app.post("/api/excel/columns", tags=["Excel"], dependencies=[Depends(verify_token)])
 async def get_excel_columns(
-    request: dict,
-    authorization: str = Header(None)
+    request: dict
 ):
     """
     Get column names from Excel file
@@ -786,13 +1200,10 @@ async def get_excel_columns(
             "file_path": "C:\\path\\to\\file.xlsx"
         }
     """
-    verify_token(authorization)
-
     try:
-        import pandas as pd
-        from pathlib import Path
+        import pandas  # noqa: F401 - used by _read_excel_header
     except ImportError:
-        raise HTTPException(status_code=500, detail="pandas not installed")
+        raise HTTPException(status_code=500, detail="pandas not installed. Install: pip install pandas openpyxl")
 
     try:
         file_path = request.get("file_path")
@@ -806,9 +1217,11 @@ async def get_excel_columns(
         if not path.exists():
             raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
 
-        # Read Excel headers
-        df = pd.read_excel(file_path, sheet_name=sheet_name, nrows=0)
-        columns = df.columns.tolist()
+        # Read only the header row, off the event loop
+        loop = asyncio.get_running_loop()
+        columns = await loop.run_in_executor(
+            app.state.blocking_pool, _read_excel_header, file_path, sheet_name
+        )
 
         return {
             "status": "success",
@@ -819,9 +1232,7 @@ async def get_excel_columns(
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"   ❌ Excel columns error: {error_details}")
+        logger.exception("Excel columns error")
         raise HTTPException(status_code=500, detail=f"Error reading Excel: {str(e)}")
 
 
@@ -829,8 +1240,8 @@ async def get_excel_columns(
 # Agent Control Endpoints
 # ============================================================================
 
-@app.post("/api/agent/start", tags=["Agent"])
-async def start_agent(authorization: str = Header(None)):
+@app.post("/api/agent/start", tags=["Agent"], dependencies=[Depends(verify_token)])
+async def start_agent():
     """
     Start the agent process
 
@@ -840,105 +1251,61 @@ async def start_agent(authorization: str = Header(None)):
             "pid": process_id
         }
     """
-    verify_token(authorization)
-
-    global agent_process, agent_start_time
-
-    # Check if already running
-    if agent_process is not None and agent_process.poll() is None:
-        return {
-            "status": "already_running",
-            "pid": agent_process.pid,
-            "uptime_seconds": (datetime.now() - agent_start_time).total_seconds() if agent_start_time else 0
-        }
-
-    try:
-        import subprocess
-        import sys
-
-        # Clean up any dead process reference
-        if agent_process is not None:
-            agent_process = None
-            agent_start_time = None
-
-        # Get the path to the agent main.py
-        agent_path = Path(__file__).parent.parent / "agent" / "main.py"
-
-        if not agent_path.exists():
-            raise HTTPException(status_code=404, detail=f"Agent script not found: {agent_path}")
-
-        # Start the agent process with proper error handling
-        # Set up environment with PYTHONPATH
-        agent_env = os.environ.copy()
-        hackapp_dir = str(agent_path.parent.parent)
-
-        # Add hackapp directory to PYTHONPATH so imports work
-        if 'PYTHONPATH' in agent_env:
-            agent_env['PYTHONPATH'] = f"{hackapp_dir}{os.pathsep}{agent_env['PYTHONPATH']}"
-        else:
-            agent_env['PYTHONPATH'] = hackapp_dir
-
-        # Force UTF-8 encoding for Windows console to handle emoji characters
-        agent_env['PYTHONIOENCODING'] = 'utf-8'
-
-        # Use CREATE_NEW_CONSOLE on Windows to prevent terminal issues
-        import platform
-        startupinfo = None
-        creationflags = 0
-
-        if platform.system() == 'Windows':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            # CREATE_NO_WINDOW flag to hide console window
-            creationflags = 0x08000000  # CREATE_NO_WINDOW
-
-        agent_process = subprocess.Popen(
-            [sys.executable, "-u", str(agent_path)],  # -u for unbuffered output
-            cwd=hackapp_dir,  # Run from hackapp/ directory
-            env=agent_env,  # Pass modified environment
-            stdout=None,  # Inherit from parent (don't capture to avoid blocking)
-            stderr=None,  # Inherit from parent
-            startupinfo=startupinfo,
-            creationflags=creationflags
-        )
-
-        agent_start_time = datetime.now()
-
-        # Give it a moment to start and check if it immediately crashes
-        import asyncio
-        await asyncio.sleep(1.0)
-
-        if agent_process.poll() is not None:
-            # Process died immediately
-            print(f"❌ Agent crashed immediately (exit code: {agent_process.returncode})")
-            agent_process = None
-            agent_start_time = None
-            raise HTTPException(
-                status_code=500,
-                detail=f"Agent crashed immediately after start (exit code: {agent_process.returncode})"
-            )
-
-        print(f"✅ Agent started successfully with PID: {agent_process.pid}")
+    # Serialized with stop: the check-then-spawn below spans several awaits
+    async with app.state.agent_lock:
+        # Check if already running
+        agent_process = app.state.agent_process
+        agent_start_monotonic = app.state.agent_start_monotonic
+        if agent_process is not None and agent_process.returncode is None:
+            return {
+                "status": "already_running",
+                "pid": agent_process.pid,
+                "uptime_seconds": time.monotonic() - agent_start_monotonic if agent_start_monotonic is not None else 0
+            }
 
-        return {
-            "status": "started",
-            "pid": agent_process.pid,
-            "message": "Agent process started successfully"
-        }
+        try:
+            # Clean up any dead process reference
+            if agent_process is not None:
+                app.state.agent_process = None
+                app.state.agent_start_monotonic = None
+
+            if not _AGENT_PATH.exists():
+                raise HTTPException(status_code=404, detail=f"Agent script not found: {_AGENT_PATH}")
+
+            agent_process = await _spawn_agent()
+            app.state.agent_process = agent_process
+            app.state.agent_start_monotonic = time.monotonic()
+
+            # Check whether it crashes immediately
+            if await _agent_crashed_on_start(agent_process):
+                exit_code = agent_process.returncode
+                logger.error("Agent crashed immediately (exit code: %s)", exit_code)
+                app.state.agent_process = None
+                app.state.agent_start_monotonic = None
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Agent crashed immediately after start (exit code: {exit_code})"
+                )
+
+            logger.info("Agent started successfully with PID: %s", agent_process.pid)
+
+            return {
+                "status": "started",
+                "pid": agent_process.pid,
+                "message": "Agent process started successfully"
+            }
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ Failed to start agent: {e}")
-        import traceback
-        traceback.print_exc()
-        agent_process = None
-        agent_start_time = None
-        raise HTTPException(status_code=500, detail=f"Failed to start agent: {str(e)}")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception("Failed to start agent")
+            app.state.agent_process = None
+            app.state.agent_start_monotonic = None
+            raise HTTPException(status_code=500, detail=f"Failed to start agent: {str(e)}")
 
 
-@app.post("/api/agent/stop", tags=["Agent"])
-async def stop_agent(authorization: str = Header(None)):
+@app.post("/api/agent/stop", tags=["Agent"], dependencies=[Depends(verify_token)])
+async def stop_agent():
     """
     Stop the agent process
 
@@ -947,51 +1314,44 @@ async def stop_agent(authorization: str = Header(None)):
             "status": "stopped" | "not_running"
         }
     """
-    verify_token(authorization)
-
-    global agent_process, agent_start_time
-
-    # Check if running
-    if agent_process is None or agent_process.poll() is not None:
-        agent_process = None
-        agent_start_time = None
-        return {
-            "status": "not_running",
-            "message": "Agent was not running"
-        }
-
-    try:
-        # Terminate the process
-        agent_process.terminate()
+    # Serialized with start so a stop can't interleave with a spawn
+    async with app.state.agent_lock:
+        # Check if running
+        agent_process = app.state.agent_process
+        if agent_process is None or agent_process.returncode is not None:
+            app.state.agent_process = None
+            app.state.agent_start_monotonic = None
+            return {
+                "status": "not_running",
+                "message": "Agent was not running"
+            }
 
-        # Wait up to 5 seconds for graceful shutdown
         try:
-            agent_process.wait(timeout=5)
-        except:
-            # Force kill if it doesn't terminate gracefully
-            agent_process.kill()
-            agent_process.wait()
-
-        pid = agent_process.pid
-        agent_process = None
-        agent_start_time = None
-
-        print(f"✅ Agent stopped (PID: {pid})")
-
-        return {
-            "status": "stopped",
-            "message": "Agent process stopped successfully"
-        }
+            # Terminate the process, force kill if it doesn't exit within 5 seconds.
+            # The wait is awaited, so other requests keep being served meanwhile.
+            graceful = await _terminate_agent(agent_process, timeout=5.0)
+
+            pid = agent_process.pid
+            app.state.agent_process = None
+            app.state.agent_start_monotonic = None
+
+            if graceful:
+                logger.info("Agent stopped (PID: %s)", pid)
+            else:
+                logger.warning("Agent did not exit within 5s and was killed (PID: %s)", pid)
+
+            return {
+                "status": "stopped",
+                "message": "Agent process stopped successfully"
+            }
 
-    except Exception as e:
-        print(f"❌ Failed to stop agent: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Failed to stop agent: {str(e)}")
+        except Exception as e:
+            logger.exception("Failed to stop agent")
+            raise HTTPException(status_code=500, detail=f"Failed to stop agent: {str(e)}")
 
 
-@app.get("/api/agent/status", tags=["Agent"])
-async def get_agent_status(authorization: str = Header(None)):
+@app.get("/api/agent/status", tags=["Agent"], dependencies=[Depends(verify_token)])
+async def get_agent_status():
     """
     Get agent process status
 
@@ -1002,86 +1362,59 @@ async def get_agent_status(authorization: str = Header(None)):
             "uptime_seconds": seconds (if running)
         }
     """
-    verify_token(authorization)
-
-    global agent_process, agent_start_time
-
-    # Check if process is running
-    if agent_process is not None and agent_process.poll() is None:
-        uptime = (datetime.now() - agent_start_time).total_seconds() if agent_start_time else 0
+    # returncode is filled in by the loop's child watcher when the agent
+    # exits, so this check costs no waitpid() per status poll
+    agent_process = app.state.agent_process
+    agent_start_monotonic = app.state.agent_start_monotonic
+    if agent_process is not None and agent_process.returncode is None:
+        uptime = time.monotonic() - agent_start_monotonic if agent_start_monotonic is not None else 0
         return {
             "running": True,
             "pid": agent_process.pid,
             "uptime_seconds": uptime
         }
     else:
-        # If process died, try to get error output
-        error_output = None
-        if agent_process is not None:
-            try:
-                stdout, stderr = agent_process.communicate(timeout=0.1)
-                error_output = stderr if stderr else stdout
-            except:
-                pass
-            agent_process = None
-            agent_start_time = None
+        # Read-only: start/stop own agent_process under agent_lock and
+        # clean up a dead reference themselves. A crashed agent's last
+        # words come from the output ring buffer, no syscalls involved.
+        last_error = None
+        if agent_process is not None and app.state.agent_logs:
+            last_error = "\n".join(list(app.state.agent_logs)[-AGENT_LAST_ERROR_LINES:])[-500:]
 
         return {
             "running": False,
             "pid": None,
             "uptime_seconds": 0,
-            "last_error": error_output[:500] if error_output else None
+            "last_error": last_error
         }
 
 
-@app.get("/api/agent/logs", tags=["Agent"])
-async def get_agent_logs(authorization: str = Header(None)):
+@app.get("/api/agent/logs", tags=["Agent"], dependencies=[Depends(verify_token)])
+async def get_agent_logs():
     """
     Get recent agent output (stdout/stderr)
 
     Returns last output from agent process
     """
-    verify_token(authorization)
-
-    global agent_process
+    agent_process = app.state.agent_process
+    output = "\n".join(app.state.agent_logs) or None
 
     if agent_process is None:
+        # Output of the last run stays available after it stopped
         return {
             "running": False,
-            "stdout": None,
+            "stdout": output,
             "stderr": None,
             "message": "Agent is not running"
         }
 
-    try:
-        # Non-blocking read of available output
-        import select
-        import os
-
-        stdout_data = ""
-        stderr_data = ""
-
-        # Try to read stdout if available
-        if agent_process.stdout:
-            try:
-                # This is a simplified approach - in production you'd use a proper logging system
-                stdout_data = "Output capture not implemented in streaming mode"
-            except:
-                pass
-
-        return {
-            "running": agent_process.poll() is None,
-            "pid": agent_process.pid if agent_process else None,
-            "stdout": stdout_data,
-            "stderr": stderr_data,
-            "message": "Agent logs (limited capture)"
-        }
-
-    except Exception as e:
-        return {
-            "running": False,
-            "error": str(e)
-        }
+    return {
+        "running": agent_process.returncode is None,
+        "pid": agent_process.pid,
+        "stdout": output,
+        "stderr": None,  # Merged into stdout
+        "message": f"Last {app.state.agent_logs.maxlen} lines of agent output (stdout and stderr)"
+    }
 
 
 # ============================================================================
@@ -1091,7 +1424,7 @@ async def get_agent_logs(authorization: str = Header(None)):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
@@ -1102,12 +1435,14 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    """Handle unexpected exceptions"""
-    print(f"❌ Unhandled exception: {exc}")
-    import traceback
-    traceback.print_exc()
+    """
+    Handle unexpected exceptions
 
-    return JSONResponse(
+    Only shapes the 500 body: Starlette re-raises the exception after this
+    handler so the server logs the traceback once; logging it here as well
+    formatted every traceback twice.
+    """
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -1124,13 +1459,19 @@ def main():
     """Start the middleware server"""
     import uvicorn
 
-    print("\n🚀 Starting HackApp Middleware Server...")
+    _write_lines("", "🚀 Starting HackApp Middleware Server...")
 
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=5000,
-        log_level="info"
+        log_level="info",
+        # "auto" picks uvloop and the httptools parser that uvicorn[standard]
+        # installs, and falls back to asyncio/h11 where they are missing
+        # (uvloop has no Windows build)
+        loop="auto",
+        http="auto",
+        access_log=False  # No log line per request; the audit log covers workflows
     )
 
 
@@ -3,10 +3,9 @@ HackApp Data Models
 Pydantic models for all data structures used across the system
 """
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Optional, Literal, Any
 from datetime import datetime
-import re
 
 
 # ============================================================================
@@ -23,15 +22,14 @@ class Context(BaseModel):
     user_id: Optional[str] = Field(None, description="User identifier (if available)")
     timestamp: Optional[datetime] = Field(default_factory=datetime.now)
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "hotkey": "CTRL+ALT+V",
-                "selected_text": "Patient presents with cough and fever",
-                "window_title": "DXCare - Patient Chart",
-                "user_id": "clinician_123"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "hotkey": "CTRL+ALT+V",
+            "selected_text": "Patient presents with cough and fever",
+            "window_title": "DXCare - Patient Chart",
+            "user_id": "clinician_123"
         }
+    })
 
 
 # ============================================================================
@@ -43,16 +41,15 @@ class InputConfig(BaseModel):
     source: Literal["selected_text", "clipboard", "active_field_text"] = "selected_text"
     validation: Optional[Dict[str, Any]] = None
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "source": "selected_text",
-                "validation": {
-                    "min_length": 10,
-                    "max_length": 5000
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "source": "selected_text",
+            "validation": {
+                "min_length": 10,
+                "max_length": 5000
             }
         }
+    })
 
 
 class RequestConfig(BaseModel):
@@ -61,30 +58,28 @@ class RequestConfig(BaseModel):
     timeout: int = Field(30, description="Request timeout in seconds", ge=1, le=300)
     method: Literal["POST", "GET", "PUT"] = "POST"
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "template": "Summarize: {{ input_text }}",
-                "timeout": 30,
-                "method": "POST"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "template": "Summarize: {{ input_text }}",
+            "timeout": 30,
+            "method": "POST"
         }
+    })
 
 
 class ResponseMapping(BaseModel):
     """Mapping configuration for extracting data from API response"""
     mappings: Dict[str, str] = Field(..., description="JSONPath mappings for response fields")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "mappings": {
-                    "summary": "$.summary",
-                    "icd10_code": "$.icd10.code",
-                    "icd10_label": "$.icd10.label"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "mappings": {
+                "summary": "$.summary",
+                "icd10_code": "$.icd10.code",
+                "icd10_label": "$.icd10.label"
             }
         }
+    })
 
 
 class OutputConfig(BaseModel):
@@ -98,15 +93,14 @@ class OutputConfig(BaseModel):
     click_before: Optional[str] = Field(None, description="Screen coordinates to click before inserting (format: 'x,y')")
     insert_method: Literal["type", "paste"] = Field("type", description="type = character by character; paste = clipboard paste")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "type": "text",
-                "target_field": "DiagnosisText",
-                "content": "{{ summary }}",
-                "mode": "replace"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "type": "text",
+            "target_field": "DiagnosisText",
+            "content": "{{ summary }}",
+            "mode": "replace"
         }
+    })
 
 
 class SecurityConfig(BaseModel):
@@ -115,13 +109,12 @@ class SecurityConfig(BaseModel):
     require_confirmation: bool = Field(False, description="Require user confirmation before insertion")
     max_response_size: int = Field(100000, description="Maximum response size in bytes")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "allowed_fields": ["DiagnosisText", "DiagnosisCode", "ClinicalNotes"],
-                "require_confirmation": False
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "allowed_fields": ["DiagnosisText", "DiagnosisCode", "ClinicalNotes"],
+            "require_confirmation": False
         }
+    })
 
 
 class ValidationConfig(BaseModel):
@@ -145,20 +138,19 @@ class WorkflowConfig(BaseModel):
     output: List[OutputConfig]
     security: Optional[SecurityConfig] = Field(default_factory=SecurityConfig)
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "workflow_id": "voice_summary_icd10",
-                "name": "Voice AI Clinical Summary with ICD-10",
-                "hotkey": "CTRL+ALT+V",
-                "enabled": True,
-                "connector": "voice_ai",
-                "input": {"source": "selected_text"},
-                "request": {"template": "Summarize: {{ input_text }}"},
-                "response": {"mappings": {"summary": "$.summary"}},
-                "output": [{"type": "text", "target_field": "DiagnosisText", "content": "{{ summary }}"}]
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "workflow_id": "voice_summary_icd10",
+            "name": "Voice AI Clinical Summary with ICD-10",
+            "hotkey": "CTRL+ALT+V",
+            "enabled": True,
+            "connector": "voice_ai",
+            "input": {"source": "selected_text"},
+            "request": {"template": "Summarize: {{ input_text }}"},
+            "response": {"mappings": {"summary": "$.summary"}},
+            "output": [{"type": "text", "target_field": "DiagnosisText", "content": "{{ summary }}"}]
         }
+    })
 
 
 # ============================================================================
@@ -192,15 +184,14 @@ class ConnectorConfig(BaseModel):
     retry_policy: Optional[RetryPolicy] = Field(default_factory=RetryPolicy)
     headers: Optional[Dict[str, str]] = Field(default_factory=dict)
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "type": "rest_api",
-                "base_url": "http://localhost:5001",
-                "endpoints": {"summarize": "/api/clinical_summary"},
-                "timeout": 30
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "type": "rest_api",
+            "base_url": "http://localhost:5001",
+            "endpoints": {"summarize": "/api/clinical_summary"},
+            "timeout": 30
         }
+    })
 
 
 # ============================================================================
@@ -218,15 +209,14 @@ class InsertionInstruction(BaseModel):
     click_before: Optional[str] = Field(None, description="Screen coordinates to click before inserting (format: 'x,y')")
     insert_method: Literal["type", "paste"] = Field("type", description="type = character by character; paste = clipboard paste")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "target_field": "DiagnosisText",
-                "content": "Pneumonia with respiratory symptoms",
-                "mode": "replace",
-                "type": "text"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "target_field": "DiagnosisText",
+            "content": "Pneumonia with respiratory symptoms",
+            "mode": "replace",
+            "type": "text"
         }
+    })
 
 
 class WorkflowResponse(BaseModel):
@@ -238,21 +228,20 @@ class WorkflowResponse(BaseModel):
     execution_time_ms: int = Field(..., ge=0)
     timestamp: datetime = Field(default_factory=datetime.now)
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "status": "success",
-                "workflow_id": "voice_summary_icd10",
-                "insertions": [
-                    {
-                        "target_field": "DiagnosisText",
-                        "content": "Pneumonia",
-                        "mode": "replace"
-                    }
-                ],
-                "execution_time_ms": 1234
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "status": "success",
+            "workflow_id": "voice_summary_icd10",
+            "insertions": [
+                {
+                    "target_field": "DiagnosisText",
+                    "content": "Pneumonia",
+                    "mode": "replace"
+                }
+            ],
+            "execution_time_ms": 1234
         }
+    })
 
 
 # ============================================================================
@@ -261,26 +250,18 @@ class WorkflowResponse(BaseModel):
 
 class ICD10Code(BaseModel):
     """ICD-10 diagnosis code"""
+    # Format is enforced by the compiled pattern; it only admits upper case
     code: str = Field(..., description="ICD-10 code", pattern=r'^[A-Z][0-9]{2}(\.[0-9A-Z]{1,4})?$')
     label: Optional[str] = Field(None, description="Human-readable label")
     category: Optional[str] = Field(None, description="Disease category")
 
-    @validator('code')
-    def validate_icd10_format(cls, v):
-        """Validate ICD-10 code format"""
-        pattern = re.compile(r'^[A-Z][0-9]{2}(\.[0-9A-Z]{1,4})?$')
-        if not pattern.match(v):
-            raise ValueError(f"Invalid ICD-10 code format: {v}")
-        return v.upper()
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "code": "J18.9",
-                "label": "Pneumonia, unspecified organism",
-                "category": "Respiratory"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "code": "J18.9",
+            "label": "Pneumonia, unspecified organism",
+            "category": "Respiratory"
         }
+    })
 
 
 # ============================================================================
@@ -288,7 +269,9 @@ class ICD10Code(BaseModel):
 # ============================================================================
 
 class ValidationResult(BaseModel):
-    """Result of a validation operation"""
+    """Result of a validation operation (immutable, so validators may cache it)"""
+    model_config = ConfigDict(frozen=True)
+
     valid: bool
     error: Optional[str] = None
     details: Optional[Dict[str, Any]] = None
@@ -308,17 +291,16 @@ class AuditLogEntry(BaseModel):
     execution_time_ms: int
     error_code: Optional[str] = None
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "timestamp": "2026-02-05T10:30:00Z",
-                "workflow_id": "voice_summary_icd10",
-                "user_id": "clinician_123",
-                "connector": "voice_ai",
-                "status": "success",
-                "execution_time_ms": 1234
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "timestamp": "2026-02-05T10:30:00Z",
+            "workflow_id": "voice_summary_icd10",
+            "user_id": "clinician_123",
+            "connector": "voice_ai",
+            "status": "success",
+            "execution_time_ms": 1234
         }
+    })
 
 
 # ============================================================================
@@ -344,3 +326,26 @@ class WorkflowListResponse(BaseModel):
     """List of available workflows"""
     workflows: List[Dict[str, Any]]
     total: int
+
+
+class PickerActivateRequest(BaseModel):
+    """Request to activate the coordinate picker for a dashboard field"""
+    session_id: str = Field(..., min_length=1, description="Dashboard picking session identifier")
+    field_name: Literal["patient_coords", "output_coords", "voice_field"] = Field(
+        ..., description="Dashboard field the picked coordinates belong to"
+    )
+
+
+class PickerCoordsRequest(BaseModel):
+    """Coordinates reported by the agent after a pick"""
+    x: int
+    y: int
+    field_name: Optional[str] = Field(None, description="Ignored while a picking session is active")
+
+
+class PickerPreviewRequest(BaseModel):
+    """Screen region to capture for an OCR preview"""
+    x: int
+    y: int
+    width: int = Field(150, gt=0)
+    height: int = Field(40, gt=0)
@@ -0,0 +1,153 @@
+"""
+Screen OCR Helpers
+Region capture and text recognition shared by the picker preview and visual workflows
+"""
+
+import os
+import base64
+import threading
+from io import BytesIO
+from typing import Optional
+
+# Fast path: mss grabs a region straight from the framebuffer and tesserocr
+# keeps libtesseract loaded in-process. Both are optional; without them we
+# fall back to pyautogui + pytesseract (which spawns the tesseract binary).
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+# Tesseract's OpenMP threading only adds coordination overhead on small
+# screen regions. libgomp reads OMP_THREAD_LIMIT once, when libtesseract
+# loads, so the limit is set just around the tesserocr import: child
+# processes (the agent, pytesseract's tesseract binary) keep their own
+# environment. An explicit user setting still wins.
+_user_omp_limit = os.environ.get("OMP_THREAD_LIMIT")
+if _user_omp_limit is None:
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+finally:
+    if _user_omp_limit is None:
+        del os.environ["OMP_THREAD_LIMIT"]
+
+
+# True when read_coords can run without pyautogui/pytesseract
+IN_PROCESS_OCR_AVAILABLE = MSS_AVAILABLE and TESSEROCR_AVAILABLE
+
+# mss and PyTessBaseAPI instances are not thread-safe, so keep one per thread
+_local = threading.local()
+
+
+def _get_mss():
+    """Get this thread's mss screen grabber"""
+    grabber = getattr(_local, "mss", None)
+    if grabber is None:
+        grabber = mss.mss()
+        _local.mss = grabber
+    return grabber
+
+
+def _get_tess_api():
+    """Get this thread's warm Tesseract API instance"""
+    api = getattr(_local, "tess_api", None)
+    if api is None:
+        api = tesserocr.PyTessBaseAPI()
+        _local.tess_api = api
+    return api
+
+
+def capture_region(x: int, y: int, width: int, height: int):
+    """
+    Capture a screen region
+
+    Args:
+        x: Left coordinate
+        y: Top coordinate
+        width: Region width in pixels
+        height: Region height in pixels
+
+    Returns:
+        PIL Image of the region (RGB)
+
+    Raises:
+        ImportError: If no capture backend is installed
+    """
+    if MSS_AVAILABLE:
+        from PIL import Image
+
+        raw = _get_mss().grab({"left": x, "top": y, "width": width, "height": height})
+        return Image.frombytes("RGB", raw.size, raw.rgb)
+
+    import pyautogui
+    return pyautogui.screenshot(region=(x, y, width, height))
+
+
+def image_to_text(image, psm: Optional[int] = None, whitelist: Optional[str] = None) -> str:
+    """
+    Run OCR on an image
+
+    Args:
+        image: PIL Image
+        psm: Tesseract page segmentation mode (None = Tesseract's default)
+        whitelist: Only recognize these characters (e.g. "0123456789")
+
+    Returns:
+        Recognized text, stripped
+
+    Raises:
+        ImportError: If no OCR backend is installed
+    """
+    if TESSEROCR_AVAILABLE:
+        api = _get_tess_api()
+        # The API is reused across calls, so always reset the mode
+        api.SetPageSegMode(tesserocr.PSM.AUTO if psm is None else psm)
+        api.SetVariable("tessedit_char_whitelist", whitelist or "")
+        api.SetImage(image)
+        return api.GetUTF8Text().strip()
+
+    import pytesseract
+    config = f"--psm {psm}" if psm is not None else ""
+    if whitelist:
+        config += f" -c tessedit_char_whitelist={whitelist}"
+    return pytesseract.image_to_string(image, config=config).strip()
+
+
+def encode_png_base64(image) -> str:
+    """
+    Encode an image as base64 PNG
+
+    Uses the lowest zlib level: previews are tiny and speed matters more
+    than a few bytes.
+
+    Args:
+        image: PIL Image
+
+    Returns:
+        Base64-encoded PNG string
+    """
+    buffered = BytesIO()
+    image.save(buffered, format="PNG", optimize=False, compress_level=1)
+    return base64.b64encode(buffered.getvalue()).decode()
+
+
+# ============================================================================
+# Test code
+# ============================================================================
+
+if __name__ == "__main__":
+    print("Testing OCR helpers...")
+    print("=" * 60)
+    print(f"  Capture backend: {'mss' if MSS_AVAILABLE else 'pyautogui'}")
+    print(f"  OCR backend: {'tesserocr' if TESSEROCR_AVAILABLE else 'pytesseract'}")
+
+    try:
+        image = capture_region(0, 0, 200, 50)
+        print(f"  ✅ Captured region: {image.size}")
+        print(f"  📝 OCR text: '{image_to_text(image)}'")
+    except Exception as e:
+        print(f"  ❌ OCR test failed: {e}")
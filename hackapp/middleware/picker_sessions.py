@@ -0,0 +1,144 @@
+"""
+Picker Session Store
+Bounded, expiring storage for coordinate-picker sessions
+"""
+
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Iterator, Optional, Tuple
+
+
+class PickerSession:
+    """
+    One coordinate-picking session
+
+    Uses __slots__ so each session is a compact fixed-layout object rather
+    than carrying a per-instance dict.
+    """
+
+    __slots__ = ("field_name", "coordinates", "event")
+
+    def __init__(self, field_name: str, coordinates: Optional[Tuple[int, int]] = None):
+        """
+        Initialize session
+
+        Args:
+            field_name: Dashboard field the coordinates are picked for
+            coordinates: (x, y) once the agent reports a click
+        """
+        self.field_name = field_name
+        self.coordinates = coordinates
+        self.event = asyncio.Event()  # Set when coordinates arrive (wakes long-polls)
+
+
+class PickerSessionStore:
+    """
+    Dict-like store with LRU eviction and a per-entry TTL
+
+    Dashboards create a new picking session on every click, so a plain dict
+    grows for the lifetime of the server. Entries here expire `ttl` seconds
+    after they were last written or read (a dashboard long-polling a session
+    keeps it alive) and the least recently used ones are dropped once
+    `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        """
+        Initialize session store
+
+        Args:
+            maxsize: Maximum number of sessions kept
+            ttl: Seconds a session stays valid after it was last written or read
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __setitem__(self, session_id: str, session: Any):
+        self._data[session_id] = (time.monotonic() + self.ttl, session)
+        self._data.move_to_end(session_id)
+        self._expire()
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __getitem__(self, session_id: str) -> Any:
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __contains__(self, session_id: object) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[str]:
+        self._expire()
+        return iter(list(self._data))
+
+    def get(self, session_id: Any, default: Any = None) -> Any:
+        """
+        Get a live session, refreshing its LRU position and TTL
+
+        Args:
+            session_id: Session identifier
+            default: Value returned if missing or expired
+
+        Returns:
+            Session value or default
+        """
+        entry = self._data.get(session_id)
+        if entry is None:
+            return default
+
+        expires_at, session = entry
+        if expires_at <= time.monotonic():
+            del self._data[session_id]
+            return default
+
+        self._data[session_id] = (time.monotonic() + self.ttl, session)
+        self._data.move_to_end(session_id)
+        return session
+
+    def pop(self, session_id: str, default: Any = None) -> Any:
+        """Remove a session and return it (or default)"""
+        entry = self._data.pop(session_id, None)
+        return entry[1] if entry is not None else default
+
+    def _expire(self):
+        """Drop expired sessions from the least recently used end"""
+        now = time.monotonic()
+        # Every write/read moves the entry to the end and renews its TTL,
+        # so entries are in expiry order: stop at the first live one
+        while self._data:
+            session_id, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            del self._data[session_id]
+
+
+# ============================================================================
+# Test code
+# ============================================================================
+
+if __name__ == "__main__":
+    print("Testing picker session store...")
+    print("=" * 60)
+
+    store = PickerSessionStore(maxsize=2, ttl=0.1)
+    store["a"] = PickerSession(field_name="patient_coords")
+    store["b"] = PickerSession(field_name="output_coords")
+    store["c"] = PickerSession(field_name="voice_field")
+    print(f"  ✅ LRU eviction: 'a' in store = {'a' in store}, size = {len(store)}")
+
+    time.sleep(0.15)
+    print(f"  ✅ TTL expiry: 'c' in store = {'c' in store}, size = {len(store)}")
+
+    store["d"] = PickerSession(field_name="voice_field")
+    for _ in range(3):
+        time.sleep(0.05)
+        store.get("d")
+    print(f"  ✅ Reads renew TTL: 'd' in store = {'d' in store}")
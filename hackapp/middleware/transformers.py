@@ -3,10 +3,60 @@ Transformers
 Template rendering and response extraction
 """
 
-from jinja2 import Template, TemplateSyntaxError, UndefinedError
+from jinja2 import Environment, Template, TemplateSyntaxError, UndefinedError
 from jsonpath_ng import parse as jsonpath_parse
-from typing import Dict, Any, Optional
-import json
+from typing import Dict, Any, Optional, Callable, List
+from functools import lru_cache
+import orjson
+import re
+
+
+# Same defaults as bare Template(...), but owned here so compiled templates
+# can be reused across renders
+_JINJA_ENV = Environment(autoescape=False, cache_size=512, auto_reload=False)
+
+
+@lru_cache(maxsize=512)
+def _compile_template(template_str: str) -> Template:
+    """Compile a template source once; workflow templates repeat constantly"""
+    return _JINJA_ENV.from_string(template_str)
+
+
+# "$.a.b.c" - plain chains of dict keys, which is nearly every mapping
+_SIMPLE_JSONPATH_RE = re.compile(r'^\$(\.[A-Za-z_][A-Za-z0-9_]*)+$')
+
+
+@lru_cache(maxsize=1024)
+def _compile_jsonpath(jsonpath_expr: str) -> Callable[[Any], List[Any]]:
+    """
+    Compile a JSONPath expression into a function returning matched values
+
+    Mappings come from static config, so each expression is parsed once.
+    Simple dotted paths are then evaluated as direct dict lookups instead of
+    walking the jsonpath_ng AST; anything else (filters, wildcards, lists)
+    goes through jsonpath_ng.
+    """
+    jsonpath = jsonpath_parse(jsonpath_expr)  # Also validates simple paths
+
+    def find(data: Any) -> List[Any]:
+        return [match.value for match in jsonpath.find(data)]
+
+    if not _SIMPLE_JSONPATH_RE.match(jsonpath_expr):
+        return find
+
+    keys = tuple(jsonpath_expr[2:].split("."))
+
+    def find_simple(data: Any) -> List[Any]:
+        value = data
+        for key in keys:
+            if not isinstance(value, dict):
+                return find(data)  # Non-dict on the way: keep jsonpath_ng semantics
+            if key not in value:
+                return []
+            value = value[key]
+        return [value]
+
+    return find_simple
 
 
 class TemplateRenderer:
@@ -28,7 +78,7 @@ class TemplateRenderer:
             UndefinedError: If required variable is missing
         """
         try:
-            template = Template(template_str)
+            template = _compile_template(template_str)
             rendered = template.render(**context)
             return rendered
         except TemplateSyntaxError as e:
@@ -53,8 +103,8 @@ class TemplateRenderer:
         rendered = self.render(template_str, context)
 
         try:
-            return json.loads(rendered)
-        except json.JSONDecodeError as e:
+            return orjson.loads(rendered)
+        except orjson.JSONDecodeError as e:
             raise ValueError(f"Rendered template is not valid JSON: {e}\nRendered: {rendered}")
 
 
@@ -90,21 +140,18 @@ class ResponseExtractor:
 
         for output_name, jsonpath_expr in mappings.items():
             try:
-                # Parse JSONPath expression
-                jsonpath = jsonpath_parse(jsonpath_expr)
-
-                # Find matches
-                matches = jsonpath.find(response_data)
+                # Find matches (expression is compiled once, see _compile_jsonpath)
+                values = _compile_jsonpath(jsonpath_expr)(response_data)
 
-                if not matches:
+                if not values:
                     # Field not found
                     extracted[output_name] = None
-                elif len(matches) == 1:
+                elif len(values) == 1:
                     # Single value
-                    extracted[output_name] = matches[0].value
+                    extracted[output_name] = values[0]
                 else:
                     # Multiple values - return as list
-                    extracted[output_name] = [match.value for match in matches]
+                    extracted[output_name] = values
 
             except Exception as e:
                 raise ValueError(f"Error extracting '{output_name}' with path '{jsonpath_expr}': {e}")
@@ -129,11 +176,10 @@ class ResponseExtractor:
             Extracted value or default
         """
         try:
-            jsonpath = jsonpath_parse(jsonpath_expr)
-            matches = jsonpath.find(response_data)
+            values = _compile_jsonpath(jsonpath_expr)(response_data)
 
-            if matches:
-                return matches[0].value
+            if values:
+                return values[0]
             return default
 
         except Exception:
@@ -175,8 +221,9 @@ class OutputBuilder:
                 if config.label:
                     label = self.renderer.render(config.label, extracted_data)
 
-                # Create instruction
-                instruction = InsertionInstruction(
+                # Create instruction. Skips validation: content/label are
+                # rendered strings and the rest comes from a validated OutputConfig
+                instruction = InsertionInstruction.model_construct(
                     target_field=config.target_field,
                     content=content,
                     mode=config.mode,
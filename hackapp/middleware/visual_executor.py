@@ -5,16 +5,420 @@ Executes visual workflows step-by-step with REAL screen automation (NO MOCKS)
 
 import time
 import os
-from typing import Dict, Any, Optional
+import threading
+import traceback
+import re
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, List, Tuple, Callable
 from pathlib import Path
+import orjson
 from dotenv import load_dotenv
 
+from middleware.ocr import capture_region, image_to_text, IN_PROCESS_OCR_AVAILABLE
+
 # Load environment variables
 load_dotenv()
 
+# Screen automation / OCR stack, imported once (the executor already pulled
+# these in at construction, so this moves no cost onto the startup path)
+try:
+    import pyautogui
+    import pytesseract
+    GUI_AVAILABLE = True
+    GUI_IMPORT_ERROR = None
+except (ImportError, OSError) as e:
+    GUI_AVAILABLE = False
+    GUI_IMPORT_ERROR = e
+
+# Excel lookups (numpy comes with pandas)
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = pd = None
+
+# Rust-based xlsx reader (pandas >= 2.2) parses several times faster than
+# openpyxl; optional, openpyxl stays the fallback
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+# OCR preprocessing (Pillow comes with pyautogui, and the mss capture path needs it too)
+try:
+    from PIL import Image, ImageChops, ImageFilter
+except ImportError:
+    Image = ImageChops = ImageFilter = None
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
 # Groq API Configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
+# Set HACKAPP_OCR_DEBUG=1 to dump each OCR capture to ocr_debug.png
+OCR_DEBUG = os.getenv("HACKAPP_OCR_DEBUG") == "1"
+OCR_DEBUG_PATH = "ocr_debug.png"
+
+# First run of digits in OCR text (patient IDs)
+_DIGITS_RE = re.compile(r'\d+')
+
+# {variable} / {variable.key} placeholders in step templates (spaces allowed in keys)
+_TEMPLATE_VAR_RE = re.compile(r'\{([a-zA-Z0-9_. ]+)\}')
+
+
+@lru_cache(maxsize=256)
+def _compile_template(template: str) -> Tuple[Tuple[str, str, Optional[Tuple[str, ...]]], ...]:
+    """
+    Split a step template into literal text and variable lookups
+
+    Templates repeat across runs of the same workflow, so the regex scan
+    happens once per template and rendering is just dict walks and a join.
+
+    Returns:
+        Tuple of (literal, var_path, key parts) segments; the trailing
+        segment has var_path "" and parts None
+    """
+    segments = []
+    pos = 0
+    for match in _TEMPLATE_VAR_RE.finditer(template):
+        var_path = match.group(1)
+        # Spaces around keys are ignored for lookup
+        parts = tuple(part.strip() for part in var_path.split('.'))
+        segments.append((template[pos:match.start()], var_path, parts))
+        pos = match.end()
+    segments.append((template[pos:], "", None))
+    return tuple(segments)
+
+
+# "[field_name]" header line in LLM output, optionally indented and with
+# the start of the content on the same line
+_LLM_HEADER_RE = re.compile(r'[ \t]*\[([^\]\n]+)\][ \t]*(.*)')
+
+# Start of another header line (same leading-whitespace rule as _LLM_HEADER_RE)
+_LLM_NEXT_HEADER_RE = re.compile(r'\n[ \t]*\[')
+
+
+def _read_llm_stream(response, last_header: Optional[str] = None) -> str:
+    """
+    Collect generated text from an OpenAI-compatible SSE stream
+
+    Stops early once the model opens another "[...]" section after the last
+    expected field header: everything from there on is discarded by
+    _parse_llm_output anyway. (The last field itself is only known to be
+    complete when something follows it, so that is the earliest safe point.)
+
+    Args:
+        response: Streaming requests.Response
+        last_header: "[field_name]" header of the last expected field
+
+    Returns:
+        Generated text (may be empty)
+    """
+    chunks = []
+    header_end = -1  # Offset just past last_header once it has streamed in
+
+    for line in response.iter_lines():
+        if not line.startswith(b"data: "):
+            continue
+        data = line[6:]
+        if data == b"[DONE]":
+            break
+
+        try:
+            choices = orjson.loads(data).get("choices") or []
+            delta = choices[0].get("delta", {}).get("content") if choices else None
+        except (orjson.JSONDecodeError, AttributeError, TypeError, KeyError, IndexError):
+            # One garbled event shouldn't fail the whole step
+            continue
+        if not delta:
+            continue
+        chunks.append(delta)
+
+        if last_header and "[" in delta:
+            text = "".join(chunks)
+            if header_end < 0:
+                found = text.find(last_header)
+                header_end = found + len(last_header) if found >= 0 else -1
+            if header_end >= 0 and _LLM_NEXT_HEADER_RE.search(text, header_end):
+                break
+
+    return "".join(chunks)
+
+
+@lru_cache(maxsize=64)
+def _llm_prompt_fields(fields: Tuple[Tuple[str, str], ...]) -> str:
+    """
+    Field list, instructions and response format section of the LLM prompt
+
+    Args:
+        fields: (name, description) pairs, in order
+
+    Returns:
+        Prompt text following the input data
+    """
+    parts = ["\nFIELDS TO FILL:\n"]
+    parts.extend(f"{i}. {name}: {description}\n" for i, (name, description) in enumerate(fields, 1))
+    parts.append(
+        "\nINSTRUCTIONS:\n"
+        "- Format the data appropriately for each field\n"
+        "- Keep it concise and clinical\n"
+        "- Use the exact field names in your response\n"
+        "- Format your response EXACTLY like this:\n\n"
+    )
+    parts.extend(f"[{name}]\n<content for this field>\n\n" for name, _ in fields)
+    parts.append("Do NOT include any other text or explanations.")
+    return "".join(parts)
+
+
+
+
+def _split_llm_sections(llm_output: str) -> Dict[str, str]:
+    """
+    Split "[field_name]" formatted LLM output into sections in one pass
+
+    A section runs until the next line starting with "[" (leading spaces
+    allowed); the first occurrence of a header wins. Text following a
+    header on the same line starts its section.
+
+    Returns:
+        Header name -> stripped section content
+    """
+    sections: Dict[str, str] = {}
+    current = None
+    lines: List[str] = []
+
+    for line in llm_output.split("\n"):
+        if not line.lstrip(" \t").startswith("["):
+            if current is not None:
+                lines.append(line)
+            continue
+
+        if current is not None:
+            sections.setdefault(current, "\n".join(lines).strip())
+        header = _LLM_HEADER_RE.match(line)
+        current = header.group(1) if header else None
+        lines = [header.group(2)] if header else []
+
+    if current is not None:
+        sections.setdefault(current, "\n".join(lines).strip())
+    return sections
+
+
+@lru_cache(maxsize=128)
+def _llm_bare_field_pattern(field_name: str) -> "re.Pattern":
+    """Compiled fallback pattern for a field written without brackets"""
+    return re.compile(rf'(?:^|\n){re.escape(field_name)}\s*\n(.*?)(?:\n[A-Z]|$)', re.DOTALL | re.MULTILINE)
+
+
+# Adaptive thresholding: neighbourhood radius (≈31px block) and the margin
+# a pixel must be darker than its neighbourhood by to count as text
+ADAPTIVE_RADIUS = 15
+ADAPTIVE_OFFSET = 10
+
+
+@lru_cache(maxsize=8)
+def _threshold_table(threshold: int, invert: bool = False) -> Tuple[int, ...]:
+    """Point lookup table mapping levels above threshold to white (black if invert)"""
+    above, below = (0, 255) if invert else (255, 0)
+    return tuple(above if level > threshold else below for level in range(256))
+
+
+def _prepare_for_ocr(image, threshold=None, scale: int = 1):
+    """
+    Binarize (and optionally upscale) a capture before OCR
+
+    Tesseract skips its own thresholding pass on a pre-binarized image.
+
+    Args:
+        image: PIL Image
+        threshold: Gray level for a fixed threshold, "adaptive" to compare
+            each pixel with its local mean (uneven or tinted backgrounds),
+            or None to pass the image through untouched
+        scale: Integer upscale factor applied first (helps small UI fonts)
+
+    Returns:
+        PIL Image ready for OCR
+    """
+    if threshold is None and scale == 1:
+        return image
+
+    gray = image.convert("L")
+    if scale != 1:
+        gray = gray.resize((gray.width * scale, gray.height * scale), Image.LANCZOS)
+
+    if threshold is None:
+        return gray
+
+    if threshold == "adaptive":
+        # Local mean via box blur; text is whatever sits clearly below it
+        local_mean = gray.filter(ImageFilter.BoxBlur(ADAPTIVE_RADIUS * scale))
+        darkness = ImageChops.subtract(local_mean, gray)
+        return darkness.point(_threshold_table(ADAPTIVE_OFFSET, invert=True), mode="1")
+
+    return gray.point(_threshold_table(threshold), mode="1")
+
+
+# ============================================================================
+# Excel cache
+# ============================================================================
+
+@lru_cache(maxsize=16)
+def _load_excel_sheet(path: str, version: Tuple[int, int], sheet_name):
+    """
+    Parse an Excel sheet once per file version
+
+    Keyed on (mtime_ns, size), so saving the workbook invalidates the entry
+    even on filesystems with coarse timestamps (FAT/exFAT drives round
+    mtime to 2s). Callers must treat the returned DataFrame as read-only.
+
+    Args:
+        path: Resolved file path
+        version: (st_mtime_ns, st_size) of the file (cache key only)
+        sheet_name: Sheet name or index
+
+    Returns:
+        pandas DataFrame
+    """
+    # Whole sheet on purpose: both engines parse every cell regardless, so
+    # usecols/dtype=str saved under 10% on a 3000x41 sheet, while a per-step
+    # column subset would split this cache (and the "Available:" error list)
+    # ExcelFile context manager releases the file handle right away
+    with pd.ExcelFile(path, engine=EXCEL_ENGINE) as xls:
+        return pd.read_excel(xls, sheet_name=sheet_name)
+
+
+@lru_cache(maxsize=16)
+def _excel_columns(path: str, version: Tuple[int, int], sheet_name) -> frozenset:
+    """Column names of a cached sheet, as a set for membership checks"""
+    return frozenset(_load_excel_sheet(path, version, sheet_name).columns)
+
+
+def _excel_cell_text(series):
+    """
+    Cell text of a column as OCR would read it off the screen
+
+    pandas reads a numeric column with any blank cell as float, so plain
+    astype(str) turns ID 12 into "12.0"; integral floats are written without
+    the fractional part instead.
+    """
+    if series.dtype.kind == "f":
+        values = series.to_numpy()
+        integral = np.isfinite(values) & (values == np.floor(values)) & (np.abs(values) < 2 ** 53)
+        text = series.astype(str)
+        text[integral] = values[integral].astype(np.int64).astype(str)
+        return text
+    if series.dtype == object:
+        return series.map(lambda v: str(int(v)) if isinstance(v, float) and v.is_integer() else str(v))
+    return series.astype(str)
+
+
+@lru_cache(maxsize=64)
+def _excel_exact_index(path: str, version: Tuple[int, int], sheet_name, column: str) -> Dict[str, int]:
+    """
+    Map normalized cell text -> first row position for one column
+
+    Built once per cached sheet so exact matches are a dict lookup instead
+    of a scan over every row. Keys are stripped and lower-cased cell text
+    (see _excel_cell_text, so ID 12 is "12" even in a float column); empty
+    cells are left out.
+    """
+    series = _load_excel_sheet(path, version, sheet_name)[column]
+    present = series.notna().to_numpy()
+    keys = _excel_cell_text(series[present]).str.strip().str.lower()
+    first = ~keys.duplicated().to_numpy()
+    positions = np.flatnonzero(present)[first]
+    return dict(zip(keys.to_numpy()[first].tolist(), positions.tolist()))
+
+
+@lru_cache(maxsize=64)
+def _excel_search_text(path: str, version: Tuple[int, int], sheet_name, column: str):
+    """
+    Lower-cased text of one column for substring fallback scans
+
+    Converted once per cached sheet; empty cells stay NaN so they never
+    match (instead of matching as the string "nan").
+    """
+    series = _load_excel_sheet(path, version, sheet_name)[column]
+    return _excel_cell_text(series).str.lower().where(series.notna())
+
+
+# Steps that only read variables and do local I/O (no screen, no implicit
+# inputs, nothing sent off the machine); consecutive independent ones run
+# concurrently. lookup_api and format_with_llm send patient data out, so they
+# run in order and never start once an earlier step has failed.
+PARALLEL_STEP_TYPES = frozenset({"lookup_excel", "lookup_db"})
+STEP_POOL_WORKERS = 4
+
+
+# Output variable each parallel step type writes when the step names none
+# (same defaults as the handlers and the step models)
+_DEFAULT_OUTPUT_VARIABLES = {
+    "lookup_excel": "excel_data",
+    "lookup_db": "db_data",
+    "lookup_api": "api_data",
+    "format_with_llm": "formatted_fields",
+}
+
+
+def _step_variables(step: Dict[str, Any]) -> Tuple[set, Optional[str]]:
+    """
+    Variables a step reads and the variable it writes
+
+    Reads cover the named input variables and {variable} placeholders in
+    query/body templates (only the top-level name matters).
+
+    Returns:
+        (names read, name written or None)
+    """
+    reads = {step.get("search_value_variable"), step.get("input_variable")}
+    for template_key in ("query", "body_template"):
+        template = step.get(template_key)
+        if template:
+            reads.update(parts[0] for _, _, parts in _compile_template(template) if parts)
+    reads.discard(None)
+    output = step.get("output_variable") or _DEFAULT_OUTPUT_VARIABLES.get(step["step_type"])
+    return reads, output
+
+
+def _batch_steps(plan: List[Tuple[Dict[str, Any], Optional[Callable]]]) -> List[List[Tuple[Dict[str, Any], Optional[Callable]]]]:
+    """
+    Group a step plan into batches that may run concurrently
+
+    Only consecutive PARALLEL_STEP_TYPES steps are grouped, and a step joins
+    the current batch only if it neither reads nor overwrites a variable
+    produced inside it. Everything else (screen, audio) is a batch of one, so
+    running batches in order gives the same result as running steps in order.
+    """
+    batches = []
+    batch: List[Tuple[Dict[str, Any], Optional[Callable]]] = []
+    produced = set()
+
+    for step, handler in plan:
+        if step["step_type"] not in PARALLEL_STEP_TYPES:
+            if batch:
+                batches.append(batch)
+            batches.append([(step, handler)])
+            batch, produced = [], set()
+            continue
+
+        reads, output = _step_variables(step)
+        if batch and (reads & produced or output in produced):
+            batches.append(batch)
+            batch, produced = [], set()
+
+        batch.append((step, handler))
+        if output is not None:
+            produced.add(output)
+
+    if batch:
+        batches.append(batch)
+    return batches
+
 
 class WorkflowExecutor:
     """Execute visual workflows with real implementations"""
@@ -22,20 +426,47 @@ class WorkflowExecutor:
     def __init__(self):
         self.variables: Dict[str, Any] = {}
 
-        # Configure tesseract path for Windows
-        try:
-            import pytesseract
+        # Step type -> handler (keep in sync with WorkflowStep.step_type)
+        self._dispatch = {
+            "read_coords": self._read_coords,
+            "lookup_excel": self._lookup_excel,
+            "lookup_db": self._lookup_db,
+            "lookup_api": self._lookup_api,
+            "format_with_llm": self._format_with_llm,
+            "write_coords": self._write_coords,
+            "record_audio": self._record_audio,
+            "transcribe_audio": self._transcribe_audio,
+            "speech_to_text": self._speech_to_text,
+        }
+
+        # Pooled HTTP sessions for the agent API and Groq, so repeated steps
+        # reuse open (TLS) connections instead of reconnecting each call.
+        # requests.Session isn't documented thread-safe and steps may run on
+        # the step pool, so each thread gets its own (see _http)
+        self._http_local = threading.local()
+
+        # workflow_id -> (steps list the plan was built from, batches of (step, handler))
+        self._plans: Dict[str, Tuple[list, List[List[Tuple[Dict[str, Any], Optional[Callable]]]]]] = {}
+
+        # Runs independent lookup/LLM steps side by side (created on first use)
+        self._step_pool: Optional[ThreadPoolExecutor] = None
+
+        if GUI_AVAILABLE:
+            # Configure tesseract path for Windows
             pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        except ImportError:
-            pass
 
-        # Disable pyautogui failsafe to prevent accidental stops
-        try:
-            import pyautogui
+            # Disable pyautogui failsafe to prevent accidental stops
             pyautogui.FAILSAFE = False
             pyautogui.PAUSE = 0.1  # Small pause between actions
-        except ImportError:
-            pass
+
+    @property
+    def _http(self):
+        """This thread's pooled requests.Session"""
+        session = getattr(self._http_local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._http_local.session = session
+        return session
 
     def execute(self, workflow: Dict[str, Any], initial_variables: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -55,30 +486,24 @@ class WorkflowExecutor:
 
         try:
             # Ensure pyautogui is in clean state
-            try:
-                import pyautogui
-                # Reset any held keys/buttons
+            if GUI_AVAILABLE:
                 pyautogui.FAILSAFE = False
-            except:
-                pass
-
-            for step in workflow["steps"]:
-                if not step.get("enabled", True):
-                    continue
 
-                step_result = self._execute_step(step)
-                results.append(step_result)
-
-                if step_result["status"] == "error":
-                    # Clean up on error
-                    self._cleanup_resources()
-                    return {
-                        "status": "error",
-                        "error": step_result.get("error"),
-                        "step_id": step["step_id"],
-                        "execution_time_ms": int((time.time() - start_time) * 1000),
-                        "variables": self.variables
-                    }
+            for batch in self._compile(workflow):
+                batch_results = self._execute_batch(batch)
+                results.extend(batch_results)
+
+                for step_result in batch_results:
+                    if step_result["status"] == "error":
+                        # Clean up on error
+                        self._cleanup_resources()
+                        return {
+                            "status": "error",
+                            "error": step_result.get("error"),
+                            "step_id": step_result["step_id"],
+                            "execution_time_ms": int((time.time() - start_time) * 1000),
+                            "variables": self.variables
+                        }
 
             # Clean up after successful execution
             self._cleanup_resources()
@@ -94,7 +519,6 @@ class WorkflowExecutor:
             # Clean up on unexpected error
             self._cleanup_resources()
             print(f"   ❌ Unexpected execution error: {e}")
-            import traceback
             traceback.print_exc()
             return {
                 "status": "error",
@@ -105,8 +529,10 @@ class WorkflowExecutor:
 
     def _cleanup_resources(self):
         """Clean up any held resources to prepare for next execution"""
+        if not GUI_AVAILABLE:
+            return
+
         try:
-            import pyautogui
             # Release any held keys
             pyautogui.keyUp('ctrl')
             pyautogui.keyUp('alt')
@@ -114,35 +540,82 @@ class WorkflowExecutor:
         except:
             pass
 
-    def _execute_step(self, step: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a single step"""
+    def _compile(self, workflow: Dict[str, Any]) -> List[List[Tuple[Dict[str, Any], Optional[Callable]]]]:
+        """
+        Resolve a workflow to batches of enabled steps and their handlers
+
+        Plans are reused while the caller keeps passing the same steps list
+        (VisualWorkflowStorage.dump() returns the same dict until the stored
+        workflow changes), so repeated runs skip the enabled/dispatch checks.
+
+        Args:
+            workflow: VisualWorkflow dict
+
+        Returns:
+            Batches (see _batch_steps) of (step, handler) pairs; handler is
+            None for unknown types
+        """
+        steps = workflow["steps"]
+        workflow_id = workflow.get("workflow_id")
+
+        cached = self._plans.get(workflow_id)
+        if cached is not None and cached[0] is steps:
+            return cached[1]
+
+        plan = _batch_steps([
+            (step, self._dispatch.get(step["step_type"]))
+            for step in steps
+            if step.get("enabled", True)
+        ])
+        if workflow_id is not None:
+            # Holding `steps` keeps the identity check above sound
+            self._plans[workflow_id] = (steps, plan)
+        return plan
+
+    def _execute_batch(self, batch: List[Tuple[Dict[str, Any], Optional[Callable]]]) -> List[Dict[str, Any]]:
+        """
+        Execute a batch of independent steps
+
+        Each handler writes a distinct key of self.variables, which is safe
+        under the GIL without extra locking.
+
+        Returns:
+            Step results in workflow order (steps cancelled after an error
+            are left out)
+        """
+        if len(batch) == 1:
+            step, handler = batch[0]
+            return [self._execute_step(step, handler)]
+
+        if self._step_pool is None:
+            self._step_pool = ThreadPoolExecutor(max_workers=STEP_POOL_WORKERS, thread_name_prefix="hackapp-step")
+
+        futures = [self._step_pool.submit(self._execute_step, step, handler) for step, handler in batch]
+
+        # Like the sequential loop, stop at the first error: steps not yet
+        # started are cancelled (running ones finish, their results are kept)
+        for future in as_completed(futures):
+            if future.result()["status"] == "error":
+                for pending in futures:
+                    pending.cancel()
+                break
+
+        return [future.result() for future in futures if not future.cancelled()]
+
+    def _execute_step(self, step: Dict[str, Any], handler: Optional[Callable] = None) -> Dict[str, Any]:
+        """Execute a single step (handler is looked up if not given)"""
         step_type = step["step_type"]
 
         try:
-            if step_type == "read_coords":
-                return self._read_coords(step)
-            elif step_type == "lookup_excel":
-                return self._lookup_excel(step)
-            elif step_type == "lookup_db":
-                return self._lookup_db(step)
-            elif step_type == "lookup_api":
-                return self._lookup_api(step)
-            elif step_type == "format_with_llm":
-                return self._format_with_llm(step)
-            elif step_type == "write_coords":
-                return self._write_coords(step)
-            elif step_type == "record_audio":
-                return self._record_audio(step)
-            elif step_type == "transcribe_audio":
-                return self._transcribe_audio(step)
-            elif step_type == "speech_to_text":
-                return self._speech_to_text(step)
-            else:
+            if handler is None:
+                handler = self._dispatch.get(step_type)
+            if handler is None:
                 return {
                     "step_id": step["step_id"],
                     "status": "error",
                     "error": f"Unknown step type: {step_type}"
                 }
+            return handler(step)
 
         except Exception as e:
             return {
@@ -153,17 +626,11 @@ class WorkflowExecutor:
 
     def _read_coords(self, step: Dict[str, Any]) -> Dict[str, Any]:
         """Read text from screen coordinates using OCR - REAL IMPLEMENTATION"""
-        try:
-            import pyautogui
-            from PIL import Image
-            import pytesseract
-            import os
-            import re
-        except ImportError as e:
+        if not (GUI_AVAILABLE or IN_PROCESS_OCR_AVAILABLE):
             return {
                 "step_id": step["step_id"],
                 "status": "error",
-                "error": f"Missing dependency: {str(e)}. Install: pip install pyautogui pillow pytesseract"
+                "error": f"Missing dependency: {GUI_IMPORT_ERROR}. Install: pip install pyautogui pillow pytesseract"
             }
 
         try:
@@ -173,43 +640,52 @@ class WorkflowExecutor:
             height = step.get("height", 40)  # Smaller height
             output_var = step["output_variable"]
             extract_numbers = step.get("extract_numbers", True)  # New: Extract only numbers
+            digits_only = step.get("digits_only", False)  # Tesseract digit whitelist (opt-in)
+            threshold = step.get("threshold")  # Gray level, "adaptive", or None (off)
+            scale = step.get("scale", 1)  # Upscale factor before OCR
+            psm = step.get("psm")  # Tesseract page segmentation mode (None = Tesseract's default)
 
-            # Small delay to ensure window is ready
-            time.sleep(0.2)
+            # Screenshot the region (nothing was clicked, so there is no
+            # redraw to wait for; mss when installed, see ocr.capture_region)
+            screenshot = capture_region(x, y, width, height)
 
-            # Screenshot the region
-            screenshot = pyautogui.screenshot(region=(x, y, width, height))
+            # DEBUG: Save screenshot to see what OCR is reading (PNG encode +
+            # disk write, so only when enabled, and off the step's thread)
+            debug = OCR_DEBUG or step.get("debug", False)
+            if debug:
+                threading.Thread(target=screenshot.save, args=(OCR_DEBUG_PATH,), daemon=True).start()
+                print(f"   🔍 DEBUG: Saving OCR screenshot to {OCR_DEBUG_PATH}")
+                print(f"   📍 Coordinates: ({x}, {y}), Size: {width}x{height}")
 
-            # DEBUG: Save screenshot to see what OCR is reading
-            debug_path = "ocr_debug.png"
-            screenshot.save(debug_path)
-            print(f"   🔍 DEBUG: OCR screenshot saved to {debug_path}")
-            print(f"   📍 Coordinates: ({x}, {y}), Size: {width}x{height}")
+            image = _prepare_for_ocr(screenshot, threshold, scale)
 
-            # OCR to extract text
-            text = pytesseract.image_to_string(screenshot).strip()
+            # OCR to extract text (warm in-process Tesseract when tesserocr is installed).
+            # No whitelist by default: with one, "ID: 12345" can come back with
+            # the label read as digits, so the number is picked out below instead
+            text = image_to_text(image, psm=psm, whitelist="0123456789" if digits_only else None)
 
-            print(f"   📝 OCR Raw Result: '{text}'")
+            if debug:
+                print(f"   📝 OCR Raw Result: '{text}'")
 
             if not text:
                 return {
                     "step_id": step["step_id"],
                     "status": "error",
-                    "error": f"No text found at coordinates ({x}, {y}). Check ocr_debug.png to see what was captured."
+                    "error": f"No text found at coordinates ({x}, {y}). Set HACKAPP_OCR_DEBUG=1 (or step debug) to save the capture to {OCR_DEBUG_PATH}."
                 }
 
             # Extract only numbers if requested (for patient IDs)
             if extract_numbers:
                 # Find first sequence of digits (patient ID)
-                numbers = re.findall(r'\d+', text)
-                if numbers:
-                    text = numbers[0]  # Take first number sequence
+                number = _DIGITS_RE.search(text)
+                if number:
+                    text = number.group()  # Take first number sequence
                     print(f"   🔢 Extracted Patient ID: '{text}'")
                 else:
                     return {
                         "step_id": step["step_id"],
                         "status": "error",
-                        "error": f"No numbers found in OCR text: '{text}'. Check ocr_debug.png."
+                        "error": f"No numbers found in OCR text: '{text}'. Set HACKAPP_OCR_DEBUG=1 (or step debug) to save the capture to {OCR_DEBUG_PATH}."
                     }
 
             # Store in variables
@@ -230,9 +706,7 @@ class WorkflowExecutor:
 
     def _lookup_excel(self, step: Dict[str, Any]) -> Dict[str, Any]:
         """Lookup data in Excel file - REAL IMPLEMENTATION"""
-        try:
-            import pandas as pd
-        except ImportError:
+        if pd is None:
             return {
                 "step_id": step["step_id"],
                 "status": "error",
@@ -242,10 +716,14 @@ class WorkflowExecutor:
         try:
             file_path = Path(step["file_path"])
 
-            # Check if file exists
-            if not file_path.exists():
+            # One stat() both checks existence and gives the cache version
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
                 # Try as absolute path or relative to current dir
-                if not Path(file_path.name).exists():
+                try:
+                    stat = Path(file_path.name).stat()
+                except FileNotFoundError:
                     return {
                         "step_id": step["step_id"],
                         "status": "error",
@@ -268,37 +746,46 @@ class WorkflowExecutor:
                 }
 
             search_value = self.variables[search_value_var]
+            fuzzy = step.get("fuzzy", True)  # Fall back to substring match when no exact hit (non-numeric values only)
 
-            # Read Excel with explicit file handle management
-            # Use ExcelFile context manager to ensure proper cleanup
-            with pd.ExcelFile(file_path, engine='openpyxl') as xls:
-                df = pd.read_excel(xls, sheet_name=sheet_name)
+            # Parsed once per file version (see _load_excel_sheet)
+            # abspath is pure string work (resolve() would stat every component)
+            cache_key = (os.path.abspath(file_path), (stat.st_mtime_ns, stat.st_size), sheet_name)
+            df = _load_excel_sheet(*cache_key)
+            columns = _excel_columns(*cache_key)
 
-            # Search for row
-            mask = df[search_column].astype(str).str.contains(str(search_value), case=False, na=False)
-            matching_rows = df[mask]
+            # Validate every referenced column before searching
+            missing = [col for col in (search_column, *return_columns) if col not in columns]
+            if missing:
+                return {
+                    "step_id": step["step_id"],
+                    "status": "error",
+                    "error": f"Column '{missing[0]}' not found in Excel. Available: {list(df.columns)}"
+                }
 
-            if matching_rows.empty:
+            # Exact (case-insensitive) match is a hashed lookup; otherwise
+            # fall back to the substring search unless the step disables it.
+            # A numeric ID never falls back: "12" must not pick row "112".
+            needle = str(search_value).strip().lower()
+            position = _excel_exact_index(*cache_key, search_column).get(needle)
+            if position is None and fuzzy and not _DIGITS_RE.fullmatch(needle):
+                # Plain substring (not regex): IDs like "J18.9" or "(A)" match literally
+                text = _excel_search_text(*cache_key, search_column)
+                mask = text.str.contains(needle, regex=False, na=False).to_numpy()
+                if mask.any():
+                    position = int(mask.argmax())  # First match
+
+            if position is None:
                 return {
                     "step_id": step["step_id"],
                     "status": "error",
                     "error": f"No match found for '{search_value}' in column '{search_column}'"
                 }
 
-            # Get first match
-            row = matching_rows.iloc[0]
+            row = df.iloc[position]
 
-            # Extract return columns
-            result = {}
-            for col in return_columns:
-                if col in df.columns:
-                    result[col] = str(row[col])
-                else:
-                    return {
-                        "step_id": step["step_id"],
-                        "status": "error",
-                        "error": f"Column '{col}' not found in Excel. Available: {list(df.columns)}"
-                    }
+            # Extract return columns in one pass (empty cells become "")
+            result = row[return_columns].fillna("").astype(str).to_dict()
 
             # Store in variables
             self.variables[output_var] = result
@@ -336,9 +823,7 @@ class WorkflowExecutor:
 
     def _write_coords(self, step: Dict[str, Any]) -> Dict[str, Any]:
         """Write text to screen coordinates - delegates to agent API"""
-        try:
-            import requests
-        except ImportError:
+        if requests is None:
             return {
                 "step_id": step["step_id"],
                 "status": "error",
@@ -351,6 +836,8 @@ class WorkflowExecutor:
             content_template = step["content_template"]
             insert_method = step.get("insert_method", "paste")
             key_sequence = step.get("key_sequence", "")
+            key_interval = step.get("key_interval", 0.05)  # Seconds between keys in key_sequence
+            preserve_clipboard = step.get("preserve_clipboard", True)  # Restore clipboard after paste
 
             # Render template with variables
             print(f"   📝 Rendering template: {content_template[:100]}...")
@@ -370,11 +857,13 @@ class WorkflowExecutor:
                 "y": y,
                 "content": content,
                 "insert_method": insert_method,
-                "key_sequence": key_sequence
+                "key_sequence": key_sequence,
+                "key_interval": key_interval,
+                "preserve_clipboard": preserve_clipboard
             }
 
             try:
-                response = requests.post(agent_url, json=payload, timeout=10)
+                response = self._http.post(agent_url, json=payload, timeout=10)
 
                 if response.status_code == 200:
                     result = response.json()
@@ -411,7 +900,6 @@ class WorkflowExecutor:
 
         except Exception as e:
             print(f"   ❌ Write error: {str(e)}")
-            import traceback
             traceback.print_exc()
             return {
                 "step_id": step["step_id"],
@@ -421,9 +909,7 @@ class WorkflowExecutor:
 
     def _format_with_llm(self, step: Dict[str, Any]) -> Dict[str, Any]:
         """Format data using Gemini LLM based on field descriptions"""
-        try:
-            import requests
-        except ImportError:
+        if requests is None:
             return {
                 "step_id": step["step_id"],
                 "status": "error",
@@ -468,32 +954,31 @@ class WorkflowExecutor:
                     }
                 ],
                 "temperature": 0.3,
-                "max_tokens": 500
+                "max_tokens": 500,
+                "stream": True
             }
 
             print(f"   🤖 Calling Groq LLM to format {len(fields)} fields...")
 
-            response = requests.post(url, headers=headers, json=payload, timeout=15)
-
-            if not response.ok:
-                return {
-                    "step_id": step["step_id"],
-                    "status": "error",
-                    "error": f"Groq API error: {response.status_code} - {response.text}"
-                }
+            # Auth header per request: the session is shared with the agent API
+            with self._http.post(url, headers=headers, json=payload, timeout=15, stream=True) as response:
+                if not response.ok:
+                    return {
+                        "step_id": step["step_id"],
+                        "status": "error",
+                        "error": f"Groq API error: {response.status_code} - {response.text}"
+                    }
 
-            result = response.json()
+                last_header = f"[{fields[-1]['name']}]" if fields else None
+                generated_text = _read_llm_stream(response, last_header)
 
-            # Extract generated text (OpenAI-compatible format)
-            if "choices" not in result or len(result["choices"]) == 0:
+            if not generated_text:
                 return {
                     "step_id": step["step_id"],
                     "status": "error",
                     "error": "No response from Groq"
                 }
 
-            generated_text = result["choices"][0]["message"]["content"]
-
             print(f"   ✅ LLM Response received")
             print(f"   📄 Raw LLM output: {generated_text[:200]}...")
 
@@ -520,53 +1005,35 @@ class WorkflowExecutor:
 
     def _build_llm_prompt(self, input_data: Any, fields: list) -> str:
         """Build prompt for Gemini to format data into fields"""
-        prompt = "You are a medical data formatter. Given patient data, format it for specific fields.\n\n"
-        prompt += "INPUT DATA:\n"
+        parts = ["You are a medical data formatter. Given patient data, format it for specific fields.\n\n",
+                 "INPUT DATA:\n"]
 
         if isinstance(input_data, dict):
-            for key, value in input_data.items():
-                prompt += f"- {key}: {value}\n"
+            parts.extend(f"- {key}: {value}\n" for key, value in input_data.items())
         else:
-            prompt += str(input_data) + "\n"
+            parts.append(f"{input_data}\n")
 
-        prompt += "\nFIELDS TO FILL:\n"
-        for i, field in enumerate(fields, 1):
-            prompt += f"{i}. {field['name']}: {field['description']}\n"
+        # Everything after the data depends only on the fields
+        parts.append(_llm_prompt_fields(tuple((field['name'], field['description']) for field in fields)))
 
-        prompt += "\nINSTRUCTIONS:\n"
-        prompt += "- Format the data appropriately for each field\n"
-        prompt += "- Keep it concise and clinical\n"
-        prompt += "- Use the exact field names in your response\n"
-        prompt += "- Format your response EXACTLY like this:\n\n"
-
-        for field in fields:
-            prompt += f"[{field['name']}]\n<content for this field>\n\n"
-
-        prompt += "Do NOT include any other text or explanations."
-
-        return prompt
+        return "".join(parts)
 
     def _parse_llm_output(self, llm_output: str, fields: list) -> dict:
         """Parse LLM output into field values"""
-        import re
-
         result = {}
 
+        # Format 1: [field_name]\ncontent - all fields in a single pass
+        sections = _split_llm_sections(llm_output)
+
         for field in fields:
             field_name = field['name']
 
-            # Try format 1: [field_name]\ncontent
-            pattern1 = rf'\[{re.escape(field_name)}\]\s*\n(.*?)(?:\n\[|$)'
-            match = re.search(pattern1, llm_output, re.DOTALL)
-
-            if match:
-                content = match.group(1).strip()
-                result[field_name] = content
+            if field_name in sections:
+                result[field_name] = sections[field_name]
             else:
                 # Try format 2: field_name\ncontent (without brackets)
                 # Match field name at line start, then capture until next capital letter or end
-                pattern2 = rf'(?:^|\n){re.escape(field_name)}\s*\n(.*?)(?:\n[A-Z]|$)'
-                match = re.search(pattern2, llm_output, re.DOTALL | re.MULTILINE)
+                match = _llm_bare_field_pattern(field_name).search(llm_output)
 
                 if match:
                     content = match.group(1).strip()
@@ -640,23 +1107,19 @@ class WorkflowExecutor:
 
     def _render_template(self, template: str) -> str:
         """Render template with variables using simple {key} or {key.subkey} syntax"""
-        import re
-
-        def replace_var(match):
-            var_path = match.group(1)
-            parts = var_path.split('.')
+        pieces = []
+        for literal, var_path, parts in _compile_template(template):
+            pieces.append(literal)
+            if parts is None:
+                continue
 
+            # EAFP: a missing key or non-dict intermediate falls to the except
             value = self.variables
-            for part in parts:
-                # Strip spaces from part for lookup
-                part = part.strip()
-                if isinstance(value, dict) and part in value:
+            try:
+                for part in parts:
                     value = value[part]
-                else:
-                    return f"{{UNDEFINED:{var_path}}}"
+            except (KeyError, TypeError, IndexError):
+                value = f"{{UNDEFINED:{var_path}}}"
+            pieces.append(str(value))
 
-            return str(value)
-
-        # Replace {variable} and {variable.key} patterns (now allows spaces in keys)
-        result = re.sub(r'\{([a-zA-Z0-9_. ]+)\}', replace_var, template)
-        return result
+        return "".join(pieces)
@@ -3,10 +3,11 @@ Visual Workflow System
 Drag-and-drop workflow builder for automation orchestration
 """
 
-from typing import List, Dict, Any, Optional, Literal
-from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional, Literal, Union
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 import json
+import orjson
 from pathlib import Path
 
 
@@ -17,7 +18,10 @@ from pathlib import Path
 class WorkflowStep(BaseModel):
     """Base class for workflow steps"""
     step_id: str = Field(..., description="Unique step identifier")
-    step_type: Literal["read_coords", "lookup_excel", "lookup_db", "lookup_api", "write_coords", "speech_to_text"]
+    step_type: Literal[
+        "read_coords", "lookup_excel", "lookup_db", "lookup_api", "format_with_llm",
+        "write_coords", "record_audio", "transcribe_audio", "speech_to_text"
+    ]
     name: str = Field(..., description="Human-readable step name")
     enabled: bool = True
 
@@ -29,6 +33,13 @@ class ReadCoordsStep(WorkflowStep):
     y: int = Field(..., description="Y coordinate")
     width: int = Field(200, description="Width of capture area")
     height: int = Field(30, description="Height of capture area")
+    threshold: Optional[Union[int, Literal["adaptive"]]] = Field(
+        None, description='Binarize before OCR: gray level (e.g. 180), "adaptive" for uneven backgrounds, or null (default) to leave the capture as is'
+    )
+    scale: int = Field(1, ge=1, le=4, description="Upscale factor before OCR (2 helps small fonts)")
+    debug: bool = Field(False, description="Save each capture to ocr_debug.png (same as HACKAPP_OCR_DEBUG=1)")
+    digits_only: bool = Field(False, description="Restrict Tesseract to digits (only for regions that contain nothing but the number; label text gets misread as digits)")
+    psm: Optional[int] = Field(None, description="Tesseract page segmentation mode (7 = single text line; null = Tesseract's default)")
     output_variable: str = Field("text", description="Variable name to store result")
 
 
@@ -40,6 +51,7 @@ class LookupExcelStep(WorkflowStep):
     search_column: str = Field(..., description="Column to search (e.g., 'A' or 'Patient Name')")
     search_value_variable: str = Field(..., description="Variable containing value to search for")
     return_columns: List[str] = Field(..., description="Columns to return (e.g., ['B', 'C'] or ['Age', 'Diagnosis'])")
+    fuzzy: bool = Field(True, description="Fall back to case-insensitive substring match when there is no exact match (never for all-digit search values such as patient IDs)")
     output_variable: str = Field("excel_data", description="Variable name to store results")
 
 
@@ -68,6 +80,9 @@ class WriteCoordsStep(WorkflowStep):
     y: int = Field(..., description="Y coordinate to click")
     content_template: str = Field(..., description="Content template with {variable} placeholders")
     insert_method: Literal["type", "paste"] = "paste"
+    key_sequence: str = Field("", description="Comma-separated keys pressed after inserting (e.g. 'tab,enter')")
+    key_interval: float = Field(0.05, ge=0, description="Seconds between keys in key_sequence")
+    preserve_clipboard: bool = Field(True, description="Restore the user's clipboard after pasting (false skips the backup/restore round-trip)")
 
 
 class SpeechToTextStep(WorkflowStep):
@@ -92,44 +107,43 @@ class VisualWorkflow(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "workflow_id": "excel_patient_lookup",
-                "name": "Excel Patient Lookup",
-                "description": "Read patient name, lookup in Excel, write results",
-                "hotkey": "CTRL+ALT+P",
-                "steps": [
-                    {
-                        "step_id": "1",
-                        "step_type": "read_coords",
-                        "name": "Get patient name",
-                        "x": 100,
-                        "y": 200,
-                        "output_variable": "patient_name"
-                    },
-                    {
-                        "step_id": "2",
-                        "step_type": "lookup_excel",
-                        "name": "Lookup patient data",
-                        "file_path": "patients.xlsx",
-                        "search_column": "Patient Name",
-                        "search_value_variable": "patient_name",
-                        "return_columns": ["Age", "Diagnosis"],
-                        "output_variable": "patient_data"
-                    },
-                    {
-                        "step_id": "3",
-                        "step_type": "write_coords",
-                        "name": "Write results",
-                        "x": 400,
-                        "y": 350,
-                        "content_template": "Age: {patient_data.Age}, Diagnosis: {patient_data.Diagnosis}",
-                        "insert_method": "paste"
-                    }
-                ]
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "workflow_id": "excel_patient_lookup",
+            "name": "Excel Patient Lookup",
+            "description": "Read patient name, lookup in Excel, write results",
+            "hotkey": "CTRL+ALT+P",
+            "steps": [
+                {
+                    "step_id": "1",
+                    "step_type": "read_coords",
+                    "name": "Get patient name",
+                    "x": 100,
+                    "y": 200,
+                    "output_variable": "patient_name"
+                },
+                {
+                    "step_id": "2",
+                    "step_type": "lookup_excel",
+                    "name": "Lookup patient data",
+                    "file_path": "patients.xlsx",
+                    "search_column": "Patient Name",
+                    "search_value_variable": "patient_name",
+                    "return_columns": ["Age", "Diagnosis"],
+                    "output_variable": "patient_data"
+                },
+                {
+                    "step_id": "3",
+                    "step_type": "write_coords",
+                    "name": "Write results",
+                    "x": 400,
+                    "y": 350,
+                    "content_template": "Age: {patient_data.Age}, Diagnosis: {patient_data.Diagnosis}",
+                    "insert_method": "paste"
+                }
+            ]
         }
+    })
 
 
 # ============================================================================
@@ -142,6 +156,15 @@ class VisualWorkflowStorage:
     def __init__(self, storage_path: str = "config/visual_workflows.json"):
         self.storage_path = Path(storage_path)
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Validated workflows, reused until the file changes on disk
+        self._cache: Optional[List[VisualWorkflow]] = None
+        self._cache_mtime: Optional[int] = None
+
+        # JSON-ready dumps of the cached workflows (reset whenever _cache is)
+        self._dumps: Dict[str, Dict[str, Any]] = {}
+        self._list_json: Optional[bytes] = None
+
         if not self.storage_path.exists():
             self._save_all([])
 
@@ -150,17 +173,55 @@ class VisualWorkflowStorage:
         data = [wf.model_dump(mode='json') for wf in workflows]
         self.storage_path.write_text(json.dumps(data, indent=2, default=str))
 
+        # The instances were validated by the API layer - keep them as-is,
+        # and reuse the dumps we just made for API responses
+        self._cache = list(workflows)
+        self._cache_mtime = self.storage_path.stat().st_mtime_ns
+        self._dumps = {wf.workflow_id: dumped for wf, dumped in zip(workflows, data)}
+        self._list_json = None
+
     def _load_all(self) -> List[VisualWorkflow]:
-        """Load all workflows from file"""
+        """Load all workflows (parsed from file only when it changed)"""
         if not self.storage_path.exists():
             return []
-        data = json.loads(self.storage_path.read_text())
-        return [VisualWorkflow(**wf) for wf in data]
+
+        mtime = self.storage_path.stat().st_mtime_ns
+        if self._cache is None or mtime != self._cache_mtime:
+            data = json.loads(self.storage_path.read_text())
+            self._cache = [VisualWorkflow(**wf) for wf in data]
+            self._cache_mtime = mtime
+            self._dumps = {}
+            self._list_json = None
+
+        return list(self._cache)
 
     def list(self) -> List[VisualWorkflow]:
         """Get all workflows"""
         return self._load_all()
 
+    def dump(self, workflow: VisualWorkflow) -> Dict[str, Any]:
+        """
+        JSON-ready dict for a stored workflow
+
+        Cached until the stored workflows change. Callers must not mutate
+        the returned dict.
+        """
+        dumped = self._dumps.get(workflow.workflow_id)
+        if dumped is None:
+            dumped = workflow.model_dump(mode='json')
+            self._dumps[workflow.workflow_id] = dumped
+        return dumped
+
+    def list_json(self) -> bytes:
+        """Serialized {"workflows": [...], "total": N} payload for the list endpoint"""
+        workflows = self._load_all()
+        if self._list_json is None:
+            self._list_json = orjson.dumps({
+                "workflows": [self.dump(wf) for wf in workflows],
+                "total": len(workflows)
+            })
+        return self._list_json
+
     def get(self, workflow_id: str) -> Optional[VisualWorkflow]:
         """Get workflow by ID"""
         workflows = self._load_all()
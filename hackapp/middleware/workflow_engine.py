@@ -58,6 +58,18 @@ class WorkflowEngine:
         self.icd10_validator = ICD10Validator(self.icd10_catalog)
         self.input_validator = InputValidator()
         self.security_validator = SecurityValidator()
+        # Built once per workflow so their result caches survive across runs
+        self.whitelist_validators = {
+            wf.workflow_id: FieldWhitelistValidator(wf.security.allowed_fields)
+            for wf in self.workflows.values()
+            if wf.security and wf.security.allowed_fields
+        }
+        # Declared order (duplicates dropped), so errors list fields as configured
+        self.required_fields = {
+            wf.workflow_id: tuple(dict.fromkeys(wf.validation.required_fields))
+            for wf in self.workflows.values()
+            if wf.validation and wf.validation.required_fields
+        }
 
         self.audit_logger = get_audit_logger()
 
@@ -116,7 +128,7 @@ class WorkflowEngine:
             if not result.valid:
                 raise ValueError(result.error)
 
-    def execute(self, hotkey: str, context: Context) -> WorkflowResponse:
+    async def execute(self, hotkey: str, context: Context) -> WorkflowResponse:
         """
         Execute workflow triggered by hotkey
 
@@ -164,7 +176,7 @@ class WorkflowEngine:
             # 5. Get connector and call external service
             connector = self.connector_registry.get(workflow.connector)
             try:
-                response_data = connector.execute(
+                response_data = await connector.execute(
                     endpoint=list(connector.config.endpoints.keys())[0],  # First endpoint
                     request_data=request_json,
                     method=workflow.request.method
@@ -268,9 +280,10 @@ class WorkflowEngine:
             return
 
         # Check required fields
-        if workflow.validation.required_fields:
+        required_fields = self.required_fields.get(workflow.workflow_id)
+        if required_fields:
             result = self.input_validator.validate_required_fields(
-                extracted_data, workflow.validation.required_fields
+                extracted_data, required_fields
             )
             if not result.valid:
                 raise ValueError(result.error)
@@ -284,8 +297,8 @@ class WorkflowEngine:
                         raise ValueError(result.error)
 
         # Validate field whitelist
-        if workflow.security and workflow.security.allowed_fields:
-            whitelist_validator = FieldWhitelistValidator(workflow.security.allowed_fields)
+        whitelist_validator = self.whitelist_validators.get(workflow.workflow_id)
+        if whitelist_validator is not None:
             for output_config in workflow.output:
                 result = whitelist_validator.validate(output_config.target_field)
                 if not result.valid:
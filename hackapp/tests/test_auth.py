@@ -0,0 +1,61 @@
+"""
+Test Bearer Token Authentication
+Run with: python -m pytest tests/test_auth.py
+"""
+
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from middleware.main import app, MIDDLEWARE_TOKEN
+
+# No context manager: startup (config loading, agent auto-start) is not run
+client = TestClient(app)
+
+PROTECTED_ROUTE = "/api/picker/activate"
+BODY = {"session_id": "auth_test", "field_name": "patient_coords"}
+
+
+def test_missing_header_rejected():
+    """No Authorization header -> 401"""
+    response = client.post(PROTECTED_ROUTE, json=BODY)
+
+    assert response.status_code == 401
+    assert response.json()["error"] == "Missing authorization header"
+
+
+def test_wrong_token_rejected():
+    """Wrong bearer token (or scheme) -> 401"""
+    response = client.post(PROTECTED_ROUTE, json=BODY, headers={"Authorization": "Bearer wrong-token"})
+    assert response.status_code == 401
+    assert response.json()["error"] == "Invalid token"
+
+    response = client.post(PROTECTED_ROUTE, json=BODY, headers={"Authorization": f"Basic {MIDDLEWARE_TOKEN}"})
+    assert response.status_code == 401
+
+
+def test_non_ascii_token_rejected():
+    """Non-ASCII tokens are compared as bytes and rejected, not a server error"""
+    response = client.post(PROTECTED_ROUTE, json=BODY, headers={"Authorization": "Bearer töken".encode("utf-8")})
+
+    assert response.status_code == 401
+
+
+def test_correct_token_accepted():
+    """Correct bearer token reaches the endpoint"""
+    response = client.post(PROTECTED_ROUTE, json=BODY, headers={"Authorization": f"Bearer {MIDDLEWARE_TOKEN}"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "picker_activated"
+
+
+if __name__ == "__main__":
+    test_missing_header_rejected()
+    test_wrong_token_rejected()
+    test_non_ascii_token_rejected()
+    test_correct_token_accepted()
+    print("✅ All auth tests passed!")
@@ -0,0 +1,37 @@
+"""
+Test Excel Column Listing
+Run with: python -m pytest tests/test_excel_columns.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pd = pytest.importorskip("pandas")
+openpyxl = pytest.importorskip("openpyxl")
+
+from middleware.main import _read_excel_header
+
+
+def test_header_names_match_pandas(tmp_path):
+    """Blank, duplicate and pre-suffixed headers get the names the lookup step sees"""
+    path = tmp_path / "headers.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Sheet1"
+    sheet.append(["ID", "Name", None, "Name", "Name.1", None, None, "Name", 2024, None])
+    sheet.append([1, "a", "b", "c", "d", "e", "f", "g", "h", None])
+    workbook.save(path)
+
+    expected = list(pd.read_excel(path, sheet_name="Sheet1").columns)
+
+    assert _read_excel_header(str(path), "Sheet1") == expected
+    assert _read_excel_header(str(path), 0) == expected
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
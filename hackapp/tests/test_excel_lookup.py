@@ -0,0 +1,96 @@
+"""
+Test Excel Lookup Step
+Run with: python -m pytest tests/test_excel_lookup.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("openpyxl")
+
+from middleware.visual_executor import WorkflowExecutor
+
+
+def _write_sheet(path, ids, names):
+    pd.DataFrame({"Patient ID": ids, "Name": names}).to_excel(path, index=False, sheet_name="Sheet1")
+
+
+def _lookup(path, column, value):
+    executor = WorkflowExecutor()
+    executor.variables["search"] = value
+    return executor._lookup_excel({
+        "step_id": "lookup",
+        "file_path": str(path),
+        "sheet_name": "Sheet1",
+        "search_column": column,
+        "search_value_variable": "search",
+        "return_columns": ["Name"],
+        "output_variable": "patient",
+    })
+
+
+def test_exact_hit(tmp_path):
+    """Exact (case-insensitive) match wins over earlier substring matches"""
+    path = tmp_path / "patients.xlsx"
+    _write_sheet(path, [112, 12], ["Alice", "Bob"])
+
+    result = _lookup(path, "Patient ID", "12")
+
+    assert result["status"] == "success"
+    assert result["output"]["patient"] == {"Name": "Bob"}
+
+
+def test_integral_float_cell_matches_digits(tmp_path):
+    """A blank cell makes pandas read IDs as float; 12345.0 still matches 12345"""
+    path = tmp_path / "patients.xlsx"
+    _write_sheet(path, [99999, None, 12345], ["Alice", "Nobody", "Bob"])
+
+    result = _lookup(path, "Patient ID", "12345")
+
+    assert result["status"] == "success"
+    assert result["output"]["patient"] == {"Name": "Bob"}
+
+
+def test_digits_never_fall_back_to_substring(tmp_path):
+    """An all-digit ID without an exact hit is "not found", not another patient"""
+    path = tmp_path / "patients.xlsx"
+    _write_sheet(path, [112, None], ["Alice", "Nobody"])
+
+    result = _lookup(path, "Patient ID", "12")
+
+    assert result["status"] == "error"
+    assert "No match found" in result["error"]
+
+
+def test_fuzzy_fallback_for_text(tmp_path):
+    """Text values still fall back to a literal substring match"""
+    path = tmp_path / "patients.xlsx"
+    _write_sheet(path, [1, 2], ["Alice Martin", "Bob (J18.9)"])
+
+    assert _lookup(path, "Name", "martin")["output"]["patient"] == {"Name": "Alice Martin"}
+    assert _lookup(path, "Name", "(j18.9)")["output"]["patient"] == {"Name": "Bob (J18.9)"}
+
+
+def test_cache_invalidated_when_file_rewritten(tmp_path):
+    """Saving the workbook again is picked up even with an unchanged mtime"""
+    path = tmp_path / "patients.xlsx"
+    _write_sheet(path, [12], ["Alice"])
+    assert _lookup(path, "Patient ID", "12")["output"]["patient"] == {"Name": "Alice"}
+
+    stat = path.stat()
+    _write_sheet(path, [12, 13], ["Bob Rewritten", "Carol"])
+    # Coarse-timestamp filesystems can keep the old mtime; size still differs
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert _lookup(path, "Patient ID", "12")["output"]["patient"] == {"Name": "Bob Rewritten"}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
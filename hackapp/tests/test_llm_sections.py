@@ -0,0 +1,87 @@
+"""
+Test LLM Output Section Parsing
+Run with: python -m pytest tests/test_llm_sections.py
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+
+from middleware.visual_executor import _split_llm_sections, _read_llm_stream
+
+
+class _FakeStream:
+    """Stands in for a streaming requests.Response"""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.consumed = 0
+
+    def iter_lines(self):
+        for line in self.lines:
+            self.consumed += 1
+            yield line
+
+
+def _event(content):
+    return b"data: " + orjson.dumps({"choices": [{"delta": {"content": content}}]})
+
+
+def _old_parse(llm_output, field_name):
+    """Per-field regex the single-pass parser replaced"""
+    match = re.search(rf'\[{re.escape(field_name)}\]\s*\n(.*?)(?:\n\[|$)', llm_output, re.DOTALL)
+    return match.group(1).strip() if match else None
+
+
+def test_matches_old_parser():
+    """Same sections as the old per-field regex, including indented headers"""
+    outputs = [
+        "[Diagnosis]\nPneumonia\n\n[Plan]\nAntibiotics\n",
+        "  [Diagnosis]\nPneumonia\n[Plan]\nAntibiotics",
+        "[Diagnosis]\r\nPneumonia\r\n[Plan]\r\nAntibiotics\r\n",
+        "[Diagnosis]\nFirst\n[Diagnosis]\nSecond\n[Plan]\nRest",
+        "[Diagnosis]\n\n   Pneumonia\n   (left lower lobe)\n[Plan]\nAntibiotics",
+    ]
+    for output in outputs:
+        sections = _split_llm_sections(output)
+        for field_name in ("Diagnosis", "Plan"):
+            assert sections.get(field_name) == _old_parse(output, field_name), (output, field_name)
+
+
+def test_content_on_header_line():
+    """Content that starts on the header line belongs to that section"""
+    sections = _split_llm_sections("[Diagnosis] Pneumonia\nleft lower lobe\n\t[Plan] Antibiotics")
+
+    assert sections == {"Diagnosis": "Pneumonia\nleft lower lobe", "Plan": "Antibiotics"}
+
+
+def test_stream_skips_malformed_events():
+    """A garbled SSE data line is skipped instead of failing the step"""
+    stream = _FakeStream([_event("[Plan]\n"), b"data: {not json", b"data: []", _event("Rest"), b"data: [DONE]"])
+
+    assert _read_llm_stream(stream) == "[Plan]\nRest"
+
+
+def test_stream_stops_at_indented_next_header():
+    """An indented header after the last field closes it, as the parser treats it"""
+    stream = _FakeStream([
+        _event("[Plan]\n"), _event("Antibiotics\n"), _event("  [Extra]\n"), _event("ignored"), b"data: [DONE]",
+    ])
+
+    text = _read_llm_stream(stream, last_header="[Plan]")
+
+    assert stream.consumed == 3
+    assert _split_llm_sections(text)["Plan"] == "Antibiotics"
+
+
+if __name__ == "__main__":
+    test_matches_old_parser()
+    test_content_on_header_line()
+    test_stream_skips_malformed_events()
+    test_stream_stops_at_indented_next_header()
+    print("✅ All LLM section tests passed!")
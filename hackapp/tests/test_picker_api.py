@@ -0,0 +1,67 @@
+"""
+Test Picker Long-Polling Endpoints
+Run with: python -m pytest tests/test_picker_api.py
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from middleware.main import app, MIDDLEWARE_TOKEN
+
+HEADERS = {"Authorization": f"Bearer {MIDDLEWARE_TOKEN}"}
+
+
+def _activate(client, session_id):
+    return client.post(
+        "/api/picker/activate",
+        json={"session_id": session_id, "field_name": "patient_coords"},
+        headers=HEADERS
+    )
+
+
+async def _poll_then_reactivate(new_session_id):
+    """Long-poll "s1", re-activate while it waits; return (response, seconds waited)"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await _activate(client, "s1")
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        poll = asyncio.ensure_future(client.get("/api/picker/status/s1?wait=5", headers=HEADERS))
+        await asyncio.sleep(0.05)
+        await _activate(client, new_session_id)
+
+        response = await poll
+        after = await client.get("/api/picker/status/s1", headers=HEADERS)
+        return response, loop.time() - start, after
+
+
+def test_reactivating_same_session_wakes_long_poll():
+    """Replacing a session answers its pending long-polls instead of leaving them to time out"""
+    response, waited, after = asyncio.run(_poll_then_reactivate("s1"))
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "waiting"
+    assert waited < 1
+    assert after.status_code == 200
+
+
+def test_activating_another_session_drops_the_old_one():
+    """The previously active session can't receive coordinates any more, so it is removed"""
+    response, waited, after = asyncio.run(_poll_then_reactivate("s2"))
+
+    assert response.status_code == 200
+    assert waited < 1
+    assert after.status_code == 404
+
+
+if __name__ == "__main__":
+    test_reactivating_same_session_wakes_long_poll()
+    test_activating_another_session_drops_the_old_one()
+    print("✅ All picker API tests passed!")
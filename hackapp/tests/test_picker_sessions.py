@@ -0,0 +1,99 @@
+"""
+Test Picker Session Store
+Run with: python -m pytest tests/test_picker_sessions.py
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from middleware.picker_sessions import PickerSession, PickerSessionStore
+
+
+def test_lru_eviction():
+    """Oldest untouched session is evicted once maxsize is reached"""
+    store = PickerSessionStore(maxsize=2, ttl=60)
+    store["a"] = PickerSession(field_name="patient_coords")
+    store["b"] = PickerSession(field_name="output_coords")
+
+    # Touch "a" so "b" becomes the least recently used
+    assert store.get("a") is not None
+    store["c"] = PickerSession(field_name="voice_field")
+
+    assert "a" in store
+    assert "b" not in store
+    assert "c" in store
+    assert len(store) == 2
+
+
+def test_ttl_expiry():
+    """Sessions disappear after their TTL"""
+    store = PickerSessionStore(maxsize=10, ttl=0.05)
+    session = PickerSession(field_name="patient_coords")
+    store["a"] = session
+    assert store.get("a") is session
+
+    time.sleep(0.1)
+
+    assert store.get("a") is None
+    assert "a" not in store
+    assert len(store) == 0
+
+
+def test_get_renews_ttl():
+    """A session that keeps being read (long-polled) does not expire"""
+    store = PickerSessionStore(maxsize=10, ttl=0.1)
+    session = PickerSession(field_name="patient_coords")
+    store["a"] = session
+
+    # Well past the original TTL, but never more than 0.1s between reads
+    for _ in range(4):
+        time.sleep(0.05)
+        assert store.get("a") is session
+
+    time.sleep(0.15)
+    assert store.get("a") is None
+
+
+def test_session_event_wakes_waiter():
+    """Long-polls wait on the stored session's event until coordinates arrive"""
+    store = PickerSessionStore()
+
+    async def poll_and_answer():
+        # Created on the running loop, as the activate endpoint does
+        store["s1"] = PickerSession(field_name="patient_coords")
+        session = store["s1"]
+        waiter = asyncio.ensure_future(asyncio.wait_for(session.event.wait(), timeout=1))
+        await asyncio.sleep(0)
+
+        store["s1"].coordinates = (10, 20)
+        store["s1"].event.set()
+
+        await waiter
+        return store["s1"].coordinates
+
+    assert asyncio.run(poll_and_answer()) == (10, 20)
+
+
+def test_session_is_mutable_in_place():
+    """Handlers update coordinates on the stored session directly"""
+    store = PickerSessionStore()
+    store["s1"] = PickerSession(field_name="patient_coords")
+
+    store["s1"].coordinates = (10, 20)
+
+    assert store.get("s1").coordinates == (10, 20)
+    assert not hasattr(store["s1"], "__dict__")
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_ttl_expiry()
+    test_get_renews_ttl()
+    test_session_event_wakes_waiter()
+    test_session_is_mutable_in_place()
+    print("✅ All picker session tests passed!")
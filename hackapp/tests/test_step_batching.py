@@ -0,0 +1,118 @@
+"""
+Test Visual Workflow Step Batching
+Run with: python -m pytest tests/test_step_batching.py
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from middleware.visual_executor import WorkflowExecutor, _batch_steps, STEP_POOL_WORKERS
+
+
+def _lookup(step_id, search="patient_id", output=None):
+    step = {"step_id": step_id, "step_type": "lookup_excel", "search_value_variable": search}
+    if output:
+        step["output_variable"] = output
+    return step
+
+
+def _ids(batches):
+    return [[step["step_id"] for step, _ in batch] for batch in batches]
+
+
+def test_independent_lookups_share_a_batch():
+    """Consecutive lookups that don't depend on each other run together"""
+    plan = [(_lookup("a", output="x"), None), (_lookup("b", output="y"), None)]
+
+    assert _ids(_batch_steps(plan)) == [["a", "b"]]
+
+
+def test_split_on_read_and_overwrite():
+    """A step reading or overwriting a variable produced in the batch starts a new one"""
+    plan = [
+        (_lookup("a", output="x"), None),
+        (_lookup("b", search="x", output="y"), None),  # reads x
+        (_lookup("c", output="y"), None),  # overwrites y
+        (_lookup("d", output="z"), None),
+    ]
+
+    assert _ids(_batch_steps(plan)) == [["a"], ["b"], ["c", "d"]]
+
+
+def test_default_output_names_split():
+    """Steps without output_variable still conflict on the handler default"""
+    plan = [(_lookup("a"), None), (_lookup("b"), None)]
+
+    assert _ids(_batch_steps(plan)) == [["a"], ["b"]]
+
+
+def test_side_effect_steps_run_alone():
+    """Screen, LLM and API steps are never batched"""
+    plan = [
+        (_lookup("a", output="x"), None),
+        ({"step_id": "llm", "step_type": "format_with_llm", "input_variable": "patient_id", "output_variable": "f"}, None),
+        ({"step_id": "api", "step_type": "lookup_api", "body_template": "{patient_id}", "output_variable": "r"}, None),
+        (_lookup("b", output="y"), None),
+    ]
+
+    assert _ids(_batch_steps(plan)) == [["a"], ["llm"], ["api"], ["b"]]
+
+
+def test_results_keep_workflow_order():
+    """Results come back in step order even when later steps finish first"""
+    executor = WorkflowExecutor()
+
+    def handler(delay):
+        def run(step):
+            time.sleep(delay)
+            return {"step_id": step["step_id"], "status": "success"}
+        return run
+
+    batch = [(_lookup("slow", output="x"), handler(0.05)), (_lookup("fast", output="y"), handler(0))]
+
+    assert [r["step_id"] for r in executor._execute_batch(batch)] == ["slow", "fast"]
+
+
+def test_error_cancels_pending_steps():
+    """Steps not yet started when one fails are cancelled, as in the sequential loop"""
+    executor = WorkflowExecutor()
+    started = []
+    release = threading.Event()
+
+    def fail(step):
+        started.append(step["step_id"])
+        return {"step_id": step["step_id"], "status": "error", "error": "boom"}
+
+    def wait(step):
+        started.append(step["step_id"])
+        release.wait(1)
+        return {"step_id": step["step_id"], "status": "success"}
+
+    # The failing step takes one worker; the rest fill the pool and queue up
+    batch = [(_lookup("fail", output="e"), fail)]
+    batch += [(_lookup(f"s{i}", output=f"v{i}"), wait) for i in range(STEP_POOL_WORKERS + 2)]
+
+    timer = threading.Timer(0.1, release.set)
+    timer.start()
+    results = executor._execute_batch(batch)
+    timer.cancel()
+    release.set()
+
+    assert results[0] == {"step_id": "fail", "status": "error", "error": "boom"}
+    assert len(results) < len(batch)
+    assert len(started) == len(results)
+
+
+if __name__ == "__main__":
+    test_independent_lookups_share_a_batch()
+    test_split_on_read_and_overwrite()
+    test_default_output_names_split()
+    test_side_effect_steps_run_alone()
+    test_results_keep_workflow_order()
+    test_error_cancels_pending_steps()
+    print("✅ All step batching tests passed!")
@@ -0,0 +1,55 @@
+"""
+Test UI Settle Waits
+Run with: python -m pytest tests/test_ui_wait.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# The agent imports its helpers as top-level modules (appended, so the
+# agent's config.py/main.py don't shadow anything for other tests)
+sys.path.append(str(Path(__file__).parent.parent / "agent"))
+
+from ui_wait import wait_until_settled
+
+
+def _frames_changing_at(change_at):
+    """Fake grab: b"before" until `change_at` seconds have passed, b"after" from then on"""
+    start = time.monotonic()
+    return lambda: b"after" if time.monotonic() - start >= change_at else b"before"
+
+
+def test_returns_early_once_redrawn():
+    """A change followed by matching captures ends the wait before the timeout"""
+    start = time.monotonic()
+    settled = wait_until_settled(_frames_changing_at(0.02), timeout=1.0, interval=0.005)
+
+    assert settled
+    assert time.monotonic() - start < 0.5
+
+
+def test_static_screen_waits_full_timeout():
+    """Without a redraw the wait lasts the whole timeout (the old fixed delay)"""
+    start = time.monotonic()
+    settled = wait_until_settled(lambda: b"static", timeout=0.1, interval=0.005)
+
+    assert not settled
+    assert time.monotonic() - start >= 0.1
+
+
+def test_never_settling_screen_stops_at_timeout():
+    """A region that keeps changing gives up at the timeout"""
+    counter = iter(range(10 ** 6))
+    start = time.monotonic()
+    settled = wait_until_settled(lambda: next(counter), timeout=0.1, interval=0.005)
+
+    assert not settled
+    assert time.monotonic() - start < 0.5
+
+
+if __name__ == "__main__":
+    test_returns_early_once_redrawn()
+    test_static_screen_waits_full_timeout()
+    test_never_settling_screen_stops_at_timeout()
+    print("✅ All UI wait tests passed!")
@@ -0,0 +1,82 @@
+"""
+Test Validators
+Run with: python -m pytest tests/test_validators.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from middleware.models import ICD10Code
+from middleware.validators import ICD10Validator, FieldWhitelistValidator, InputValidator
+
+
+def test_missing_fields_in_declared_order():
+    """Missing required fields are reported in the order the workflow declares them"""
+    result = InputValidator().validate_required_fields(
+        {"patient_id": "12"}, ("zeta", "patient_id", "alpha", "middle")
+    )
+
+    assert not result.valid
+    assert result.details["missing_fields"] == ["zeta", "alpha", "middle"]
+    assert result.error == "Missing required fields: zeta, alpha, middle"
+
+
+def test_required_fields_present():
+    """All present -> the shared passing result"""
+    validator = InputValidator()
+
+    assert validator.validate_required_fields({"a": 1, "b": 2}, ("a", "b")) is InputValidator.VALID
+
+
+def test_icd10_results_cached_per_instance():
+    """Repeated codes (any case/spacing) come from the validator's cache"""
+    validator = ICD10Validator()
+
+    first = validator.validate_format("j18.9")
+    again = validator.validate_format(" J18.9 ")
+
+    assert first.valid
+    assert again is first
+    assert not validator.validate_format("XYZ").valid
+
+    # Caches are per instance, not shared across validators
+    assert ICD10Validator().validate_format("J18.9") is not first
+
+
+def test_icd10_catalog_replacement_clears_cache():
+    """Assigning a new catalog invalidates cached existence results"""
+    validator = ICD10Validator({"J18.9": ICD10Code(code="J18.9", label="Pneumonia")})
+
+    assert validator.validate_exists("J18.9").valid
+    assert not validator.validate_exists("I10").valid
+
+    validator.catalog = {"I10": ICD10Code(code="I10", label="Hypertension")}
+
+    assert validator.validate_exists("I10").valid
+    assert validator.validate_exists("I10").details == {"label": "Hypertension"}
+    assert not validator.validate_exists("J18.9").valid
+
+
+def test_whitelist_results_cached():
+    """Whitelist checks are cached per validator and stay case-insensitive"""
+    validator = FieldWhitelistValidator(["DiagnosisText", "ClinicalNotes"])
+
+    first = validator.validate("diagnosistext")
+    assert first.valid
+    assert validator.validate("diagnosistext") is first
+
+    blocked = validator.validate("BankAccount")
+    assert not blocked.valid
+    assert blocked.details["allowed_fields"] == ["clinicalnotes", "diagnosistext"]
+
+
+if __name__ == "__main__":
+    test_missing_fields_in_declared_order()
+    test_required_fields_present()
+    test_icd10_results_cached_per_instance()
+    test_icd10_catalog_replacement_clears_cache()
+    test_whitelist_results_cached()
+    print("✅ All validator tests passed!")